@@ -7,46 +7,16 @@ import os
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import pandas as pd
+import numpy as np
 import re
-import hashlib
 from app.config import CONFIG
+from app.streamlit_utils import in_parallel, categorize_names
 
 load_dotenv()
 
-class WaterChatBot: 
-    def __init__(self): 
-        self.supabase = None
-        self.llm = None
-        self.chain = None
-        self.initialized = False
-        self.init_error = None
-        self.query_cache = {}  # Cache for frequent queries
-        
-    def initialize(self):
-        """Initialize the chatbot components with proper error handling"""
-        try:
-            # Initialize Supabase client
-            supabase_url = os.getenv("SUPABASE_URL")
-            supabase_key = os.getenv("SUPABASE_ANON_KEY")
-            if not supabase_url or not supabase_key:
-                raise ValueError("Supabase credentials not found")
-            
-            self.supabase = create_client(supabase_url, supabase_key)
-            
-            # Initialize Gemini model
-            gemini_key = os.getenv("GEMINI_API_KEY")
-            if not gemini_key:
-                raise ValueError("Gemini API key not found")
-                
-            self.llm = ChatGoogleGenerativeAI(
-                model="gemini-1.5-flash",
-                google_api_key=gemini_key,
-                temperature=0.3
-            )
-            
-            # Set up the prompt template
-            self.prompt_template = ChatPromptTemplate.from_messages([
-                ("system", """
+GEMINI_MODEL = "gemini-1.5-flash"
+
+SYSTEM_PROMPT = """
                 You are an expert water management system analyst with access to:
                 1. Water quality data (water_quality table)
                 2. Flow rate data (flow_rate table)
@@ -79,25 +49,266 @@ class WaterChatBot:
                 8. Always include 6-7 representative entries in tables
                 9. Safe ranges for quality parameters:
                    {safe_ranges}
-                """),
-                ("human", """
+                """
+
+HUMAN_PROMPT = """
                 Question: {question}
                 
                 Current Alerts: {alerts}
                 
                 Data Context (CSV):
                 {context}
-                """)
-            ])
+                """
+
+# Safe ranges never change at runtime, so bake them into the system
+# prompt once at import instead of re-sending them as a variable
+SYSTEM_INSTRUCTION = SYSTEM_PROMPT.format(
+    safe_ranges="\n".join([f"{k}: {v}" for k, v in CONFIG["SAFE_RANGES"].items()])
+)
+
+# The prompt template is parsed once at import and shared by every chain.
+# The system prompt is far below Gemini's minimum context-cache size, so it
+# is sent inline rather than through caching.CachedContent
+CHAT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", SYSTEM_INSTRUCTION),
+    ("human", HUMAN_PROMPT)
+])
+
+# Intent-parsing vocabulary, built once at import. Matching stays
+# substring-based because several keywords and names span multiple words.
+FLOW_KEYWORDS = ("flow", "totalizer", "location")
+LATEST_KEYWORDS = ("latest", "current", "now", "recent")
+TIME_KEYWORDS = (
+    ("today", timedelta(hours=24)),
+    ("yesterday", timedelta(hours=48)),
+    ("last hour", timedelta(hours=1)),
+    ("last 24 hours", timedelta(hours=24)),
+    ("last week", timedelta(weeks=1)),
+    ("recent", timedelta(hours=6)),
+    ("now", timedelta(hours=1)),
+    ("current", timedelta(hours=1))
+)
+FULL_SCAN_KEYWORDS = (
+    "trend", "pattern", "over time", "historical", "all data",
+    "complete", "entire", "whole", "every", "each", "summary",
+    "overview", "analysis", "report"
+)
+DATE_PATTERN = re.compile(r'(\d{4}-\d{2}-\d{2})|(june \d{1,2}|july \d{1,2})')
+# Canned questions (including the sidebar quick queries) that are plain
+# aggregations and are answered locally without calling the LLM
+ALERT_QUICK_KEYWORDS = ("latest water quality alerts", "latest alerts", "current alerts")
+HIGHEST_FLOW_KEYWORDS = ("highest flow",)
+FLOW_SUMMARY_KEYWORDS = ("flow rate summary", "flow summary")
+PARAMETERS_LOWER = tuple((param.lower(), param) for param in CONFIG["PARAMETERS"])
+LOCATIONS_LOWER = tuple((loc.lower(), loc) for loc in CONFIG["LOCATIONS"])
+
+# Columns each table contributes to the chatbot; nothing else is fetched
+TABLE_COLUMNS = {
+    "water_quality": ("timestamp", "parameter_name", "value"),
+    "flow_rate": ("timestamp", "location_name", "totalizer")
+}
+
+# Safe ranges as arrays indexed by position in CONFIG["PARAMETERS"], so
+# alert checks are a vectorized comparison with no per-row lookups
+PARAMETER_INDEX = {param: i for i, param in enumerate(CONFIG["PARAMETERS"])}
+SAFE_MIN = np.array([CONFIG["SAFE_RANGES"][param][0] for param in CONFIG["PARAMETERS"]], dtype=np.float64)
+SAFE_MAX = np.array([CONFIG["SAFE_RANGES"][param][1] for param in CONFIG["PARAMETERS"]], dtype=np.float64)
+
+def summarize_for_llm(df, sample_rows=20):
+    """
+    Build compact LLM context for a fetched frame: row count, time span,
+    per-parameter (or per-location) stats and a small sample of rows.
+    Keeps prompt size bounded no matter how many rows were fetched.
+    """
+    lines = [f"Records: {len(df)}"]
+    if 'timestamp' in df.columns:
+        lines.append(f"Time range: {df['timestamp'].min()} to {df['timestamp'].max()}")
+    
+    if 'parameter_name' in df.columns and 'value' in df.columns:
+        group_col, value_col = 'parameter_name', 'value'
+    elif 'location_name' in df.columns and 'totalizer' in df.columns:
+        group_col, value_col = 'location_name', 'totalizer'
+    else:
+        group_col = value_col = None
+    
+    if group_col:
+        values = pd.to_numeric(df[value_col], errors='coerce')
+        stats = values.groupby(df[group_col], observed=True).agg(['count', 'min', 'max', 'mean'])
+        if group_col == 'parameter_name':
+            # Out-of-range counts let the model answer compliance questions
+            # from the summary alone, without seeing every reading
+            safe_min = df[group_col].map(lambda p: CONFIG["SAFE_RANGES"].get(p, (np.nan, np.nan))[0]).astype(float)
+            safe_max = df[group_col].map(lambda p: CONFIG["SAFE_RANGES"].get(p, (np.nan, np.nan))[1]).astype(float)
+            out_of_range = (values < safe_min) | (values > safe_max)
+            stats['out_of_range'] = out_of_range.groupby(df[group_col], observed=True).sum()
+        lines.append(f"Stats by {group_col}:")
+        lines.append(stats.to_csv(float_format='%.2f', lineterminator='\n'))
+    
+    lines.append("Sample data:")
+    lines.append(df.head(sample_rows).to_csv(index=False, float_format='%.2f', lineterminator='\n'))
+    return "\n".join(lines)
+
+@st.cache_resource(show_spinner=False)
+def get_supabase_client(supabase_url, supabase_key):
+    """Create the Supabase client once and share it across reruns"""
+    return create_client(supabase_url, supabase_key)
+
+def resolve_time_bounds(time_range):
+    """Translate a normalized intent time range into (start, end) ISO bounds"""
+    if time_range == "full":
+        # Full date range for comprehensive analysis
+        return '2025-06-01', '2025-07-01'
+    if time_range[0] == "relative":
+        return time_range[1], None
+    # Parse absolute date - this is simplified
+    return '2025-06-01', '2025-06-02'
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_quality_summary(_supabase, time_range, filters):
+    """
+    Per-parameter avg/min/max/count and latest reading, aggregated in Postgres
+    by the water_quality_summary function (see database/init_db.sql).
+    """
+    start, end = resolve_time_bounds(time_range)
+    params = dict(filters).get("parameter_name")
+    result = _supabase.rpc('water_quality_summary', {
+        "start_ts": start,
+        "end_ts": end,
+        "params": list(params) if params else None
+    }).execute()
+    return pd.DataFrame(result.data) if result.data else pd.DataFrame()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_flow_totals(_supabase, time_range, filters):
+    """
+    Per-location flow sum and mean, aggregated in Postgres by the
+    get_flow_totals function (see database/init_db.sql).
+    """
+    start, end = resolve_time_bounds(time_range)
+    locations = dict(filters).get("location_name")
+    result = _supabase.rpc('get_flow_totals', {
+        "start_ts": start,
+        "end_ts": end,
+        "locations": list(locations) if locations else None
+    }).execute()
+    if not result.data:
+        return pd.DataFrame()
+    totals = pd.DataFrame(result.data).set_index('location_name')
+    return totals.rename(columns={'total_flow': 'sum', 'avg_flow': 'mean'}).apply(pd.to_numeric, errors='coerce')
+
+def build_table_query(supabase, table, columns, time_range, filters, count=None):
+    """Build a fresh filtered select; postgrest builders mutate in place so they are never reused"""
+    query = supabase.table(table).select(','.join(columns), count=count)
+    
+    # Apply time filters based on intent
+    start, end = resolve_time_bounds(time_range)
+    query = query.gte('timestamp', start)
+    if end:
+        query = query.lte('timestamp', end)
+    
+    # Apply additional filters
+    for field, values in filters:
+        query = query.in_(field, list(values))
+    return query
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_alert_arrays(_supabase, time_range):
+    """
+    Recent water quality readings as parallel NumPy arrays: parameter codes
+    (index into CONFIG["PARAMETERS"], -1 if unknown) and float32 values.
+    The alert path never builds a DataFrame.
+    """
+    result = build_table_query(
+        _supabase, 'water_quality', ('parameter_name', 'value'), time_range, ()
+    ).range(0, 999).execute()
+    rows = result.data or []
+    
+    codes = np.fromiter(
+        (PARAMETER_INDEX.get(row['parameter_name'], -1) for row in rows),
+        dtype=np.int8, count=len(rows)
+    )
+    values = np.fromiter(
+        (np.nan if row['value'] is None else row['value'] for row in rows),
+        dtype=np.float32, count=len(rows)
+    )
+    return codes, values
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_table_data(_supabase, table, columns, time_range, filters, aggregation, needs_full_scan):
+    """
+    Fetch rows from Supabase for a normalized query description.
+    All arguments except the client are hashable so Streamlit can key the
+    cache on them; results are reused for 5 minutes.
+    """
+    def build_query(count=None):
+        return build_table_query(_supabase, table, columns, time_range, filters, count)
+        
+    # For latest queries, get only the most recent records
+    if aggregation == "latest":
+        result = build_query().order('timestamp', desc=True).limit(10).execute()
+        return categorize_names(pd.DataFrame(result.data)) if result.data else pd.DataFrame()
+    
+    # The first page also reports the total row count for full scans, so the
+    # remaining pages can be requested in parallel instead of walking offsets
+    page_size = 1000  # Use larger pages for full scans to reduce API calls
+    # Pages are ordered by primary key so parallel ranges never overlap
+    first = build_query(count='exact' if needs_full_scan else None).order('id').range(0, page_size - 1).execute()
+    all_data = first.data or []
+    
+    # Without a full scan the first page already covers the 500-row sample
+    if needs_full_scan and first.count and first.count > page_size:
+        pages = in_parallel(*[
+            lambda offset=offset: build_query().order('id').range(offset, offset + page_size - 1).execute().data
+            for offset in range(page_size, first.count, page_size)
+        ])
+        for page_data in pages:
+            all_data.extend(page_data or [])
+    
+    return categorize_names(pd.DataFrame(all_data)) if all_data else pd.DataFrame()
+
+class WaterChatBot: 
+    def __init__(self): 
+        self.supabase = None
+        self.llm = None
+        self.chain = None
+        self.initialized = False
+        self.init_error = None
+        
+    def initialize(self):
+        """Initialize the chatbot components with proper error handling"""
+        try:
+            # Initialize Supabase client
+            supabase_url = os.getenv("SUPABASE_URL")
+            supabase_key = os.getenv("SUPABASE_ANON_KEY")
+            if not supabase_url or not supabase_key:
+                raise ValueError("Supabase credentials not found")
+            
+            self.supabase = get_supabase_client(supabase_url, supabase_key)
+            
+            # Initialize Gemini model
+            gemini_key = os.getenv("GEMINI_API_KEY")
+            if not gemini_key:
+                raise ValueError("Gemini API key not found")
+                
+            self.gemini_key = gemini_key
             
             # Create the processing chain
-            self.chain = self.prompt_template | self.llm | StrOutputParser()
+            self.build_chain()
             self.initialized = True
             
         except Exception as e:
             self.init_error = str(e)
             self.initialized = False
 
+    def build_chain(self):
+        """Build the LLM chain"""
+        self.llm = ChatGoogleGenerativeAI(
+            model=GEMINI_MODEL,
+            google_api_key=self.gemini_key,
+            temperature=0.3
+        )
+        self.chain = CHAT_PROMPT | self.llm | StrOutputParser()
+
     def parse_query_intent(self, question):
         """
         Parse the user's question to determine what data to fetch
@@ -113,34 +324,22 @@ class WaterChatBot:
         }
         
         # Determine which table to query
-        if any(word in question_lower for word in ["flow", "totalizer", "location"]):
+        if any(word in question_lower for word in FLOW_KEYWORDS):
             result["table"] = "flow_rate"
         
         # Check for specific time references
-        time_keywords = {
-            "today": timedelta(hours=24),
-            "yesterday": timedelta(hours=48),
-            "last hour": timedelta(hours=1),
-            "last 24 hours": timedelta(hours=24),
-            "last week": timedelta(weeks=1),
-            "recent": timedelta(hours=6),
-            "now": timedelta(hours=1),
-            "current": timedelta(hours=1)
-        }
-        
-        for keyword, delta in time_keywords.items():
+        for keyword, delta in TIME_KEYWORDS:
             if keyword in question_lower:
                 result["time_range"] = ("relative", datetime.now() - delta)
                 break
                 
         # Check for specific date mentions
-        date_pattern = r'(\d{4}-\d{2}-\d{2})|(june \d{1,2}|july \d{1,2})'
-        date_match = re.search(date_pattern, question_lower)
+        date_match = DATE_PATTERN.search(question_lower)
         if date_match:
             result["time_range"] = ("absolute", date_match.group(0))
         
         # Check for aggregation requests
-        if any(word in question_lower for word in ["latest", "current", "now", "recent"]):
+        if any(word in question_lower for word in LATEST_KEYWORDS):
             result["aggregation"] = "latest"
         elif "average" in question_lower or "mean" in question_lower:
             result["aggregation"] = "average"
@@ -149,117 +348,81 @@ class WaterChatBot:
             
         # Extract specific parameters for water quality
         if result["table"] == "water_quality":
-            params = []
-            for param in CONFIG["PARAMETERS"]:
-                if param.lower() in question_lower:
-                    params.append(param)
+            params = [param for param_lower, param in PARAMETERS_LOWER if param_lower in question_lower]
             if params:
                 result["filters"]["parameter_name"] = params
                 
         # Extract locations for flow data
         if result["table"] == "flow_rate":
-            # You would need to define known locations in your CONFIG
-            known_locations = ["Ground Water Source 1", "Industrial Process", "Treatment Plant Inlet"]
-            locations = []
-            for loc in known_locations:
-                if loc.lower() in question_lower:
-                    locations.append(loc)
+            locations = [loc for loc_lower, loc in LOCATIONS_LOWER if loc_lower in question_lower]
             if locations:
                 result["filters"]["location_name"] = locations
                 
         # Determine if we need a full database scan
         # Questions about trends, patterns, or comprehensive analysis need full data
-        needs_full_scan_keywords = [
-            "trend", "pattern", "over time", "historical", "all data", 
-            "complete", "entire", "whole", "every", "each", "summary",
-            "overview", "analysis", "report"
-        ]
-        
-        if any(keyword in question_lower for keyword in needs_full_scan_keywords):
+        if any(keyword in question_lower for keyword in FULL_SCAN_KEYWORDS):
             result["needs_full_scan"] = True
             result["time_range"] = "full"
                 
         return result
 
-    def fetch_data(self, table, intent):
+    def normalize_intent(self, intent):
+        """
+        Normalize the intent into hashable cache-key arguments. Relative
+        start times are truncated to the minute so repeated questions hit
+        the Streamlit cache instead of producing a new key every call.
+        """
+        time_range = intent["time_range"]
+        if time_range != "full" and time_range[0] == "relative":
+            time_range = ("relative", time_range[1].replace(second=0, microsecond=0).isoformat())
+        filters = tuple(sorted((field, tuple(values)) for field, values in intent["filters"].items()))
+        return time_range, filters
+
+    def fetch_data(self, table, intent, columns=None):
         """
         Fetch data from Supabase based on query intent
         Uses intelligent filtering to minimize data transfer when possible
-        but will scan the entire database when needed
+        but will scan the entire database when needed.
+        Only `columns` (default: TABLE_COLUMNS[table]) are selected.
         """
         if not self.initialized or not self.supabase:
             return pd.DataFrame()
             
-        # Create a cache key to avoid duplicate queries
-        cache_key = hashlib.md5(f"{table}_{str(intent)}".encode()).hexdigest()
-        
-        # Return cached result if available (valid for 5 minutes)
-        if cache_key in self.query_cache:
-            cached_time, cached_data = self.query_cache[cache_key]
-            if (datetime.now() - cached_time).total_seconds() < 300:  # 5 minute cache
-                return cached_data
+        time_range, filters = self.normalize_intent(intent)
         
         try:
-            # Build base query
-            query = self.supabase.table(table).select('*')
-            
-            # Apply time filters based on intent
-            if intent["time_range"] != "full":
-                if intent["time_range"][0] == "relative":
-                    start_time = intent["time_range"][1]
-                    query = query.gte('timestamp', start_time.isoformat())
-                elif intent["time_range"][0] == "absolute":
-                    # Parse absolute date - this is simplified
-                    query = query.gte('timestamp', '2025-06-01').lte('timestamp', '2025-06-02')
-            else:
-                # Full date range for comprehensive analysis
-                query = query.gte('timestamp', '2025-06-01').lte('timestamp', '2025-07-01')
-            
-            # Apply additional filters
-            for field, values in intent["filters"].items():
-                query = query.in_(field, values)
-                
-            # For latest queries, get only the most recent records
-            if intent["aggregation"] == "latest":
-                query = query.order('timestamp', desc=True).limit(10)
-                result = query.execute()
-                df = pd.DataFrame(result.data) if result.data else pd.DataFrame()
-            else:
-                # For comprehensive queries, use proper pagination to get ALL data
-                all_data = []
-                page_size = 1000  # Use larger pages for full scans to reduce API calls
-                offset = 0
-                
-                while True:
-                    result = query.range(offset, offset + page_size - 1).execute()
-                    page_data = result.data
-                    
-                    if not page_data:
-                        break
-                        
-                    all_data.extend(page_data)
-                    offset += page_size
-                    
-                    # If we don't need a full scan, break early with enough data
-                    if not intent["needs_full_scan"] and len(all_data) >= 500:
-                        break
-                    
-                    if len(page_data) < page_size:
-                        break
-                
-                df = pd.DataFrame(all_data) if all_data else pd.DataFrame()
-            
-            # Cache the result
-            self.query_cache[cache_key] = (datetime.now(), df)
-            return df
-            
+            return fetch_table_data(
+                self.supabase,
+                table,
+                tuple(columns or TABLE_COLUMNS[table]),
+                time_range,
+                filters,
+                intent["aggregation"],
+                intent["needs_full_scan"]
+            )
         except Exception as e:
             st.error(f"Data fetch error: {str(e)}")
             return pd.DataFrame()
 
+    def fetch_summary(self, intent):
+        """Fetch server-side aggregated water quality statistics for the intent"""
+        if not self.initialized or not self.supabase:
+            return pd.DataFrame()
+            
+        time_range, filters = self.normalize_intent(intent)
+        
+        try:
+            return fetch_quality_summary(self.supabase, time_range, filters)
+        except Exception as e:
+            st.error(f"Summary fetch error: {str(e)}")
+            return pd.DataFrame()
+
     def check_alerts(self):
         """Check for parameter alerts with validation - optimized version"""
         alerts = []
+        if not self.initialized or not self.supabase:
+            return alerts
+            
         try:
             # Only check recent data for alerts (last 24 hours)
             intent = {
@@ -270,73 +433,171 @@ class WaterChatBot:
                 "needs_full_scan": False
             }
             
-            quality_df = self.fetch_data('water_quality', intent)
-            if not quality_df.empty:
-                quality_df['value'] = pd.to_numeric(quality_df['value'], errors='coerce')
-                quality_df.dropna(subset=['value'], inplace=True)
-
-                for _, row in quality_df.iterrows():
-                    param = row['parameter_name']
-                    if param in CONFIG["SAFE_RANGES"]:
-                        min_val, max_val = CONFIG["SAFE_RANGES"][param]
-                        value = row['value']
-                        if not (min_val <= value <= max_val):
-                            alerts.append(f"{param}: {value} (Safe: {min_val}-{max_val})")
-                            
+            time_range, _ = self.normalize_intent(intent)
+            codes, values = fetch_alert_arrays(self.supabase, time_range)
+            
+            # Branchless range check against per-parameter bound arrays;
+            # unknown parameters and missing values never alert
+            known = (codes >= 0) & ~np.isnan(values)
+            param_idx = np.where(known, codes, 0)
+            out_of_range = known & (
+                (values < SAFE_MIN[param_idx]) | (values > SAFE_MAX[param_idx])
+            )
+            
             # Limit alerts to prevent prompt overload
-            alerts = alerts[:5]
+            for i in np.flatnonzero(out_of_range)[:5]:
+                param = CONFIG["PARAMETERS"][codes[i]]
+                min_val, max_val = CONFIG["SAFE_RANGES"][param]
+                alerts.append(f"{param}: {values[i]:.2f} (Safe: {min_val}-{max_val})")
             
         except Exception as e:
             st.error(f"Alert check failed: {str(e)}")
             
         return alerts
 
+    def quick_answer(self, question):
+        """
+        Answer canned alert and flow questions straight from the data.
+        Returns the reply, or None when the question needs the LLM.
+        """
+        question_lower = question.lower()
+        
+        if any(keyword in question_lower for keyword in ALERT_QUICK_KEYWORDS):
+            alerts = self.check_alerts()
+            if not alerts:
+                return "✅ All water quality parameters are within safe ranges over the last 24 hours."
+            return "🚨 Out-of-range readings in the last 24 hours:\n\n" + "\n".join(f"- {alert}" for alert in alerts)
+        
+        wants_highest = any(keyword in question_lower for keyword in HIGHEST_FLOW_KEYWORDS)
+        wants_summary = any(keyword in question_lower for keyword in FLOW_SUMMARY_KEYWORDS)
+        if not (wants_highest or wants_summary):
+            return None
+        
+        # Both canned answers come from one server-side aggregate over the
+        # question's window, so they always agree with each other
+        intent = self.parse_query_intent(question)
+        time_range, filters = self.normalize_intent(intent)
+        try:
+            totals = fetch_flow_totals(self.supabase, time_range, filters)
+        except Exception:
+            # get_flow_totals not deployed yet; aggregate every row of the same window
+            df = self.fetch_data("flow_rate", {**intent, "aggregation": None, "needs_full_scan": True})
+            if df.empty:
+                return None
+            totals = pd.to_numeric(df['totalizer'], errors='coerce').groupby(df['location_name'], observed=True).agg(['sum', 'mean'])
+        if totals.empty:
+            return None
+        
+        if wants_highest:
+            top = totals['sum'].idxmax()
+            return f"**{top}** has the highest flow, with a total of {totals.loc[top, 'sum']:,.0f} L."
+        
+        lines = ["| Location | Total Flow (L) | Average Flow (L) |", "|---|---:|---:|"]
+        lines += [f"| {location} | {row['sum']:,.0f} | {row['mean']:,.2f} |" for location, row in totals.iterrows()]
+        return "\n".join(lines)
+
+    def build_inputs(self, question):
+        """
+        Resolve a question into chain inputs.
+        Returns (inputs, None), or (None, reply) when the question can be
+        answered without calling the LLM.
+        """
+        # Canned questions are simple aggregations; skip the LLM round trip
+        reply = self.quick_answer(question)
+        if reply:
+            return None, reply
+        
+        # Parse the question to understand what data is needed
+        intent = self.parse_query_intent(question)
+        
+        # Aggregate questions over water quality are answered from a
+        # Postgres-side summary plus a handful of recent rows instead of
+        # paginating through every raw reading
+        use_summary = intent["table"] == "water_quality" and (
+            intent["aggregation"] == "average" or intent["needs_full_scan"]
+        )
+        
+        # The alert check and the question's data are independent
+        # Supabase round-trips, so issue them concurrently
+        if use_summary:
+            alerts, summary_df, sample_df = in_parallel(
+                self.check_alerts,
+                lambda: self.fetch_summary(intent),
+                lambda: self.fetch_data(intent["table"], {**intent, "aggregation": "latest"})
+            )
+        else:
+            alerts, df = in_parallel(
+                self.check_alerts,
+                lambda: self.fetch_data(intent["table"], intent)
+            )
+        alert_status = "✅ All parameters normal" if not alerts else "\n".join(alerts)
+        
+        if use_summary:
+            if not summary_df.empty:
+                context_data = "Per-parameter summary:\n" + summary_df.to_csv(index=False)
+                if not sample_df.empty:
+                    context_data += "\nLatest readings:\n" + sample_df.to_csv(index=False)
+                return {
+                    "question": question,
+                    "context": context_data,
+                    "alerts": alert_status
+                }, None
+            # Summary RPC unavailable; fall back to the raw rows
+            df = self.fetch_data(intent["table"], intent)
+        
+        if df.empty:
+            return None, "No relevant data found for your query."
+            
+        # Send a compact summary plus a small sample rather than the full frame
+        context_data = summarize_for_llm(df)
+        if intent["aggregation"] == "average" and 'value' in df.columns:
+            avg_value = pd.to_numeric(df['value'], errors='coerce').mean()
+            context_data = f"The average value is: {avg_value:.2f}\n\n" + context_data
+        elif intent["aggregation"] == "latest":
+            context_data = "Latest readings:\n" + context_data
+            
+        return {
+            "question": question,
+            "context": context_data,
+            "alerts": alert_status
+        }, None
+
     def generate_response(self, question):
         """Generate response with comprehensive error handling and optimized queries"""
         if not self.initialized:
             return "❌ Chatbot is not properly initialized."
             
         try:
-            # Parse the question to understand what data is needed
-            intent = self.parse_query_intent(question)
+            inputs, reply = self.build_inputs(question)
+            if reply:
+                return reply
+            return self.chain.invoke(inputs)
             
-            alerts = self.check_alerts()
-            alert_status = "✅ All parameters normal" if not alerts else "\n".join(alerts)
-            
-            # Format safe ranges for the prompt
-            safe_ranges = "\n".join([f"{k}: {v}" for k, v in CONFIG["SAFE_RANGES"].items()])
-            
-            # Fetch only the needed data
-            df = self.fetch_data(intent["table"], intent)
+        except Exception as e:
+            return f"❌ Error generating response: {str(e)}"
+
+    def stream_response(self, question):
+        """Yield the response in chunks as Gemini produces them"""
+        if not self.initialized:
+            yield "❌ Chatbot is not properly initialized."
+            return
             
-            if df.empty:
-                return "No relevant data found for your query."
-                
-            # If user asked for an aggregation, pre-calculate it
-            context_data = df.to_csv()
-            if intent["aggregation"] == "average" and not df.empty and 'value' in df.columns:
-                avg_value = df['value'].mean()
-                context_data = f"The average value is: {avg_value:.2f}\n\nSample Data:\n" + df.head(10).to_csv()
-            elif intent["aggregation"] == "latest" and not df.empty:
-                context_data = "Latest readings:\n" + df.to_csv()
-            elif intent["needs_full_scan"] and len(df) > 1000:
-                # For large datasets, provide a summary instead of all data
-                summary = f"Comprehensive analysis of {len(df)} records. Key insights:\n"
-                if 'value' in df.columns:
-                    summary += f"- Values range from {df['value'].min():.2f} to {df['value'].max():.2f}\n"
-                    summary += f"- Average value: {df['value'].mean():.2f}\n"
-                summary += f"- Time range: {df['timestamp'].min()} to {df['timestamp'].max()}\n"
-                context_data = summary + "\nSample data:\n" + df.sample(min(10, len(df))).to_csv()
-                
-            return self.chain.invoke({
-                "question": question,
-                "context": context_data,
-                "alerts": alert_status,
-                "safe_ranges": safe_ranges
-            })
+        try:
+            inputs, reply = self.build_inputs(question)
+            if reply:
+                yield reply
+                return
+            yield from self.chain.stream(inputs)
             
         except Exception as e:
-            return f"❌ Error generating response: {str(e)}"
+            yield f"❌ Error generating response: {str(e)}"
+
+@st.cache_resource(show_spinner=False)
+def get_chatbot():
+    """Create and initialize the chatbot once per process"""
+    chatbot = WaterChatBot()
+    chatbot.initialize()
+    return chatbot
 
 def show_chatbot(initial_question=None):
     """Main function to display the chatbot interface"""
@@ -353,15 +614,15 @@ def show_chatbot(initial_question=None):
         st.info("Please check your environment variables or .env file")
         return
     
-    # Initialize chatbot in session state
-    if "chatbot" not in st.session_state:
-        st.session_state.chatbot = WaterChatBot()
-        with st.spinner("Initializing AI chatbot..."):
-            st.session_state.chatbot.initialize()
-        
-        if not st.session_state.chatbot.initialized:
-            st.error(f"Chatbot initialization failed: {st.session_state.chatbot.init_error}")
-            return
+    # One initialized chatbot is shared by every session and rerun
+    with st.spinner("Initializing AI chatbot..."):
+        chatbot = get_chatbot()
+    
+    if not chatbot.initialized:
+        st.error(f"Chatbot initialization failed: {chatbot.init_error}")
+        # Don't keep a broken instance around; retry on the next rerun
+        get_chatbot.clear()
+        return
     
     # Initialize chat history if not exists
     if "chat_history" not in st.session_state:
@@ -373,7 +634,7 @@ def show_chatbot(initial_question=None):
         with st.chat_message("user"):
             st.markdown(initial_question)
         
-        response = st.session_state.chatbot.generate_response(initial_question)
+        response = chatbot.generate_response(initial_question)
         st.session_state.chat_history.append({"role": "assistant", "content": response})
     
     # Display chat history
@@ -388,9 +649,8 @@ def show_chatbot(initial_question=None):
             st.markdown(prompt)
         
         with st.chat_message("assistant"):
-            with st.spinner("Analyzing..."):
-                response = st.session_state.chatbot.generate_response(prompt)
-                st.markdown(response)
+            # Render tokens as they arrive; write_stream returns the full text
+            response = st.write_stream(chatbot.stream_response(prompt))
         
         st.session_state.chat_history.append({"role": "assistant", "content": response})
 
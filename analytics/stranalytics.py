@@ -1,15 +1,41 @@
 import streamlit as st 
 import plotly.express as px 
 import pandas as pd 
+import numpy as np
+import pyarrow as pa
 from supabase import create_client 
 import os 
 from datetime import datetime 
 from dotenv import load_dotenv
-from app.config import CONFIG
+from app.config import SAFE_MIN_BY_PARAM, SAFE_MAX_BY_PARAM
+from app.streamlit_utils import in_parallel, categorize_names
 
 # Initialize environment variables
 load_dotenv()
 
+# Arrow types for the columns the analytics views read. Name columns are
+# dictionary-encoded so they arrive in pandas as categoricals; timestamps
+# stay as strings and are parsed where a chart needs them.
+ARROW_TYPES = {
+    'id': pa.int64(),
+    'timestamp': pa.string(),
+    'day': pa.string(),
+    'parameter_name': pa.dictionary(pa.int32(), pa.string()),
+    'location_name': pa.dictionary(pa.int32(), pa.string()),
+    'value': pa.float64(),
+    'totalizer': pa.float64()
+}
+
+# Date window shown by the analytics dashboard; passed as strings so they
+# form part of the data cache keys
+ANALYTICS_START = "2025-06-01"
+ANALYTICS_END = "2025-07-01"
+
+@st.cache_resource(show_spinner=False)
+def get_supabase_client(supabase_url, supabase_key):
+    """Create the Supabase client once and share it across reruns"""
+    return create_client(supabase_url, supabase_key)
+
 def initialize_supabase():
     """Initialize and return Supabase client with error handling"""
     try:
@@ -20,72 +46,193 @@ def initialize_supabase():
             st.error("Supabase credentials not configured")
             return None
             
-        return create_client(supabase_url, supabase_key)
+        return get_supabase_client(supabase_url, supabase_key)
     except Exception as e:
         st.error(f"Failed to initialize Supabase: {str(e)}")
         return None
 
-def fetch_data_with_pagination(table_name, supabase_client, start_date=None, end_date=None):
-    """Fetch data with pagination handling"""
-    all_data = []
+def pages_to_frame(pages):
+    """Turn pages of JSON rows into one DataFrame via Arrow, converting to pandas once"""
+    pages = [page for page in pages if page]
+    if not pages:
+        return pd.DataFrame()
+    
+    # Unknown columns (e.g. from select('*')) fall back to type inference
+    names = list(pages[0][0].keys())
+    schema = pa.schema([(name, ARROW_TYPES[name]) for name in names]) if all(name in ARROW_TYPES for name in names) else None
+    
+    tables = [pa.Table.from_pylist(page, schema=schema) for page in pages]
+    return pa.concat_tables(tables).to_pandas()
+
+def filter_by_category(df, column, selected):
+    """Keep rows whose categorical column is one of `selected`, matching on integer codes"""
+    names = df[column].cat
+    selected_codes = names.categories.get_indexer(list(selected))
+    return df[np.isin(names.codes.to_numpy(), selected_codes[selected_codes >= 0])]
+
+def fetch_data_with_pagination(table_name, supabase_client, start_date=None, end_date=None,
+                               date_column='timestamp', order_by=('id',), columns='*', report_errors=True):
+    """Fetch data with pagination handling; with report_errors=False failures are raised to the caller"""
     page_size = 1000
-    offset = 0
     
-    try:
-        while True:
-            query = supabase_client.table(table_name).select('*')
-            
-            if start_date:
-                query = query.gte('timestamp', start_date.isoformat())
-            if end_date:
-                query = query.lte('timestamp', end_date.isoformat())
-                
-            result = query.range(offset, offset + page_size - 1).execute()
-            page_data = result.data
-            
-            if not page_data:
-                break
-                
-            all_data.extend(page_data)
-            offset += page_size
+    def fetch_page(offset, count=None):
+        # Query builders mutate in place, so every page gets a fresh one
+        query = supabase_client.table(table_name).select(columns, count=count)
+        
+        if start_date:
+            query = query.gte(date_column, start_date.isoformat())
+        if end_date:
+            query = query.lte(date_column, end_date.isoformat())
+        
+        # A stable order keeps concurrently fetched pages from overlapping
+        for column in order_by:
+            query = query.order(column)
             
-            if len(page_data) < page_size:
-                break
+        return query.range(offset, offset + page_size - 1).execute()
+    
+    try:
+        # The first page also asks for the exact row count
+        first_page = fetch_page(0, count='exact')
+        pages = [first_page.data]
+        total = first_page.count
+        
+        if total is not None:
+            # With the total known, request all remaining pages at once
+            offsets = range(page_size, total, page_size)
+            if offsets:
+                pages.extend(in_parallel(*[lambda offset=offset: fetch_page(offset).data for offset in offsets]))
+        else:
+            # No count available: walk the pages until a short one comes back
+            offset = page_size
+            while len(pages[-1]) == page_size:
+                pages.append(fetch_page(offset).data)
+                offset += page_size
                 
-        return pd.DataFrame(all_data)
+        return pages_to_frame(pages)
     except Exception as e:
+        if not report_errors:
+            raise
         st.error(f"Pagination fetch error for {table_name}: {str(e)}")
         return pd.DataFrame()
 
-def fetch_analytics_data():
-    """Fetch analytics data with comprehensive error handling and pagination"""
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_analytics_data(start, end):
+    """Fetch analytics data with comprehensive error handling and pagination (cached for 5 minutes per date range)"""
     supabase = initialize_supabase()
     if not supabase:
         return pd.DataFrame(), pd.DataFrame()
     
     try:
-        # Get quality data for June 2025 with pagination
-        quality_df = fetch_data_with_pagination(
-            'water_quality',
-            supabase,
-            datetime(2025, 6, 1),
-            datetime(2025, 7, 1)
-        )
-        
-        # Get flow data for June 2025 with pagination
-        flow_df = fetch_data_with_pagination(
-            'flow_rate',
-            supabase,
-            datetime(2025, 6, 1),
-            datetime(2025, 7, 1)
+        # Get quality and flow data for June 2025 with pagination; the two
+        # tables are independent, so fetch them side by side
+        quality_df, flow_df = in_parallel(
+            lambda: fetch_data_with_pagination(
+                'water_quality',
+                supabase,
+                datetime.fromisoformat(start),
+                datetime.fromisoformat(end),
+                columns='timestamp,parameter_name,value'
+            ),
+            lambda: fetch_data_with_pagination(
+                'flow_rate',
+                supabase,
+                datetime.fromisoformat(start),
+                datetime.fromisoformat(end),
+                columns='timestamp,location_name,totalizer'
+            )
         )
             
-        return quality_df, flow_df
+        return categorize_names(quality_df), categorize_names(flow_df)
         
     except Exception as e:
         st.error(f"Data fetch error: {str(e)}")
         return pd.DataFrame(), pd.DataFrame()
 
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_daily_quality_data(start, end):
+    """
+    Per-day parameter means from the water_quality_daily view (cached for 5
+    minutes). Returns None if the view is unavailable.
+    """
+    supabase = initialize_supabase()
+    if not supabase:
+        return None
+    
+    # Bucketed by Postgres, so only one row per day and parameter comes back
+    try:
+        daily_df = fetch_data_with_pagination(
+            'water_quality_daily',
+            supabase,
+            datetime.fromisoformat(start),
+            datetime.fromisoformat(end),
+            date_column='day',
+            order_by=('day', 'parameter_name'),
+            report_errors=False
+        )
+    except Exception:
+        return None
+    if daily_df.empty:
+        return daily_df
+    
+    daily_df['value'] = pd.to_numeric(daily_df['value'], errors='coerce')
+    daily_df['day'] = pd.to_datetime(daily_df['day'], format='ISO8601', cache=True)
+    return categorize_names(daily_df.sort_values('day'))
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_param_stats(start, end, params):
+    """
+    Per-parameter statistics computed in Postgres by get_param_stats
+    (see database/init_db.sql). Returns None if the function is unavailable.
+    """
+    supabase = initialize_supabase()
+    if not supabase:
+        return None
+    
+    try:
+        result = supabase.rpc('get_param_stats', {
+            'start_ts': start,
+            'end_ts': end,
+            'params': list(params) if params else None
+        }).execute()
+    except Exception:
+        return None
+    
+    if not result.data:
+        return None
+    
+    stats_summary = pd.DataFrame(result.data).set_index('parameter_name')
+    stats_summary = stats_summary[['readings', 'mean', 'std_dev', 'min_value', 'max_value', 'median']].astype(float).round(2)
+    stats_summary['readings'] = stats_summary['readings'].astype(int)
+    stats_summary.columns = ['Count', 'Mean', 'Std Dev', 'Min', 'Max', 'Median']
+    return stats_summary
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_flow_by_location(start, end, locations):
+    """
+    Average flow per location computed in Postgres by get_flow_by_location
+    (see database/init_db.sql). Returns None if the function is unavailable.
+    """
+    supabase = initialize_supabase()
+    if not supabase:
+        return None
+    
+    try:
+        result = supabase.rpc('get_flow_by_location', {
+            'start_ts': start,
+            'end_ts': end,
+            'locations': list(locations) if locations else None
+        }).execute()
+    except Exception:
+        return None
+    
+    if not result.data:
+        return None
+    
+    loc_summary = pd.DataFrame(result.data)
+    loc_summary['totalizer'] = loc_summary['totalizer'].astype(float)
+    return loc_summary
+
+@st.cache_data(ttl=300, show_spinner=False)
 def clean_quality_data(quality_df):
     """Clean and validate quality data"""
     if quality_df.empty:
@@ -99,66 +246,116 @@ def clean_quality_data(quality_df):
         st.error(f"Missing required columns: {', '.join(missing_columns)}")
         return pd.DataFrame()
     
-    # Clean the data
-    quality_df_clean = quality_df.copy()
-    quality_df_clean['value'] = pd.to_numeric(quality_df_clean['value'], errors='coerce')
-    quality_df_clean = quality_df_clean.dropna(subset=['value', 'parameter_name'])
+    # Clean the data; assign only allocates the replaced column instead of
+    # copying the whole frame. float32 is ample for sensor readings and
+    # halves the column for the groupby, pivot and compliance passes.
+    quality_df_clean = quality_df.assign(
+        value=pd.to_numeric(quality_df['value'], errors='coerce').astype(np.float32)
+    ).dropna(subset=['value', 'parameter_name'])
     
     return quality_df_clean
 
-def render_parameter_trends(filtered_quality_df):
+@st.cache_data(ttl=300, show_spinner=False)
+def daily_quality_means(quality_df):
+    """Per-day parameter means computed in pandas, for when water_quality_daily is unavailable"""
+    days = pd.to_datetime(quality_df['timestamp'], format='ISO8601', cache=True).dt.floor('D').rename('day')
+    return quality_df.groupby([days, 'parameter_name'], observed=True)['value'].mean().reset_index()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_trends_figure(filtered_daily_df):
+    """Build the daily parameter trends chart; memoized on the filtered data"""
+    return px.line(
+        filtered_daily_df, 
+        x='day', 
+        y='value', 
+        color='parameter_name',
+        title='Selected Parameter Trends Over Time (Daily Average)',
+        labels={'value': 'Parameter Value', 'day': 'Date'}
+    )
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_correlation_figure(filtered_quality_df):
+    """Build the correlation heatmap, or None if fewer than 2 parameters line up"""
+    # Pair readings that share an exact timestamp, as a timestamp x parameter
+    # pivot_table would, but group on integer codes for both keys instead of
+    # hashing the timestamp strings and parameter names
+    timestamp_codes, _ = pd.factorize(filtered_quality_df['timestamp'])
+    names = filtered_quality_df['parameter_name'].cat
+    pivot_data = filtered_quality_df['value'].groupby(
+        [timestamp_codes, names.codes.to_numpy()]
+    ).mean().unstack()
+    pivot_data.columns = names.categories[pivot_data.columns]
+    
+    if len(pivot_data.columns) <= 1:
+        return None
+        
+    correlation_matrix = pivot_data.corr()
+    return px.imshow(
+        correlation_matrix,
+        title="Parameter Correlation Matrix",
+        color_continuous_scale='RdBu',
+        aspect='auto'
+    )
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_flow_figure(loc_summary):
+    """Build the average-flow-by-location bar chart from per-location means"""
+    return px.bar(
+        loc_summary,
+        x='location_name',
+        y='totalizer',
+        color='location_name',
+        title='Average Flow Values by Location',
+        labels={'totalizer': 'Average Flow Rate', 'location_name': 'Location'}
+    )
+
+def render_parameter_trends(filtered_daily_df):
     """Render parameter trends visualization"""
-    if filtered_quality_df.empty:
+    if filtered_daily_df.empty:
         st.info("No data available for trend analysis")
         return
         
-    filtered_quality_df['datetime'] = pd.to_datetime(filtered_quality_df['timestamp'], format='mixed')
-    fig = px.line(
-        filtered_quality_df, 
-        x='datetime', 
-        y='value', 
-        color='parameter_name',
-        title='Selected Parameter Trends Over Time',
-        labels={'value': 'Parameter Value', 'datetime': 'Date'}
-    )
+    fig = build_trends_figure(filtered_daily_df)
     st.plotly_chart(fig, use_container_width=True)
 
-def render_statistical_summary(filtered_quality_df):
+def render_statistical_summary(filtered_quality_df, stats_summary=None):
     """Render statistical analysis section"""
     if filtered_quality_df.empty:
         st.info("No data available for statistical analysis")
         return
     
-    # Basic statistics
-    stats_summary = filtered_quality_df.groupby('parameter_name')['value'].agg([
-        'count', 'mean', 'std', 'min', 'max', 'median'
-    ]).round(2)
-    stats_summary.columns = ['Count', 'Mean', 'Std Dev', 'Min', 'Max', 'Median']
+    # Basic statistics; computed locally only when Postgres didn't supply them
+    if stats_summary is None:
+        stats_summary = filtered_quality_df.groupby('parameter_name', observed=True)['value'].agg([
+            'count', 'mean', 'std', 'min', 'max', 'median'
+        ]).round(2)
+        stats_summary.columns = ['Count', 'Mean', 'Std Dev', 'Min', 'Max', 'Median']
     st.dataframe(stats_summary, use_container_width=True)
     
-    # Compliance analysis
-    compliance_data = []
-    for param in filtered_quality_df['parameter_name'].unique():
-        if param in CONFIG["SAFE_RANGES"]:
-            param_data = filtered_quality_df[filtered_quality_df['parameter_name'] == param]
-            min_val, max_val = CONFIG["SAFE_RANGES"][param]
-            
-            total_readings = len(param_data)
-            compliant_readings = len(param_data[
-                (param_data['value'] >= min_val) & (param_data['value'] <= max_val)
-            ])
-            compliance_rate = (compliant_readings / total_readings * 100) if total_readings > 0 else 0
-            
-            compliance_data.append({
-                'Parameter': param,
-                'Total Readings': total_readings,
-                'Compliant': compliant_readings,
-                'Compliance Rate (%)': round(compliance_rate, 1)
-            })
-    
-    if compliance_data:
+    # Compliance analysis: bounds are looked up once per category and
+    # gathered by code, then per-parameter counts come from bincount
+    names = filtered_quality_df['parameter_name'].cat
+    safe_min = np.array([SAFE_MIN_BY_PARAM.get(p, np.nan) for p in names.categories], dtype=np.float32)
+    safe_max = np.array([SAFE_MAX_BY_PARAM.get(p, np.nan) for p in names.categories], dtype=np.float32)
+    
+    codes = names.codes.to_numpy()
+    values = filtered_quality_df['value'].to_numpy()
+    has_range = ~np.isnan(safe_min[codes])
+    compliant = (values >= safe_min[codes]) & (values <= safe_max[codes])
+    
+    totals = np.bincount(codes[has_range], minlength=len(names.categories))
+    compliant_counts = np.bincount(codes[compliant], minlength=len(names.categories))
+    present = totals > 0
+    
+    if present.any():
+        compliance_df = pd.DataFrame({
+            'Parameter': names.categories[present],
+            'Total Readings': totals[present],
+            'Compliant': compliant_counts[present],
+            'Compliance Rate (%)': (compliant_counts[present] / totals[present] * 100).round(1)
+        })
+        
         st.markdown("#### Compliance Analysis")
-        compliance_df = pd.DataFrame(compliance_data)
         st.dataframe(compliance_df, use_container_width=True)
 
 def render_correlation_analysis(filtered_quality_df):
@@ -167,20 +364,8 @@ def render_correlation_analysis(filtered_quality_df):
         st.info("Need at least 2 parameters for correlation analysis")
         return
         
-    pivot_data = filtered_quality_df.pivot_table(
-        index='timestamp',
-        columns='parameter_name',
-        values='value'
-    )
-    
-    if len(pivot_data.columns) > 1:
-        correlation_matrix = pivot_data.corr()
-        fig = px.imshow(
-            correlation_matrix,
-            title="Parameter Correlation Matrix",
-            color_continuous_scale='RdBu',
-            aspect='auto'
-        )
+    fig = build_correlation_figure(filtered_quality_df)
+    if fig is not None:
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("Not enough data for correlation analysis")
@@ -188,15 +373,15 @@ def render_correlation_analysis(filtered_quality_df):
 def render_flow_analysis(filtered_flow_df, selected_locations):
     """Render flow rate analysis by location"""
     if not filtered_flow_df.empty and selected_locations:
-        loc_summary = filtered_flow_df.groupby('location_name')['totalizer'].mean().reset_index()
-        fig = px.bar(
-            loc_summary,
-            x='location_name',
-            y='totalizer',
-            color='location_name',
-            title='Average Flow Values by Location',
-            labels={'totalizer': 'Average Flow Rate', 'location_name': 'Location'}
+        # Averaged in Postgres; fall back to pandas if the RPC is unavailable
+        loc_summary = fetch_flow_by_location(
+            ANALYTICS_START,
+            ANALYTICS_END,
+            tuple(sorted(selected_locations))
         )
+        if loc_summary is None:
+            loc_summary = filtered_flow_df.groupby('location_name', observed=True)['totalizer'].mean().reset_index()
+        fig = build_flow_figure(loc_summary)
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("Please select at least one location for comparison")
@@ -206,7 +391,7 @@ def show_analytics():
     st.markdown("### 📊 Advanced Analytics")
     
     # Fetch and clean data (now with pagination)
-    quality_df, flow_df = fetch_analytics_data()
+    quality_df, flow_df = fetch_analytics_data(ANALYTICS_START, ANALYTICS_END)
     quality_df_clean = clean_quality_data(quality_df)
     
     if quality_df_clean.empty or flow_df.empty:
@@ -224,8 +409,8 @@ def show_analytics():
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        parameters = quality_df_clean['parameter_name'].unique()
-        parameters_list = list(parameters) if hasattr(parameters, '__array__') else parameters
+        # Categories are already known, so no scan over the column is needed
+        parameters_list = quality_df_clean['parameter_name'].cat.categories.tolist()
         selected_params = st.multiselect(
             "Select Parameters",
             parameters_list,
@@ -233,8 +418,7 @@ def show_analytics():
         )
     
     with col2:
-        locations = flow_df['location_name'].unique()
-        locations_list = list(locations) if hasattr(locations, '__array__') else locations
+        locations_list = flow_df['location_name'].cat.categories.tolist()
         selected_locations = st.multiselect(
             "Select Locations",
             locations_list,
@@ -249,34 +433,48 @@ def show_analytics():
         )
     
     # Filter data based on selections
-    filtered_quality_df = quality_df_clean[
-        quality_df_clean['parameter_name'].isin(selected_params)
-    ] if selected_params else quality_df_clean
+    filtered_quality_df = filter_by_category(
+        quality_df_clean, 'parameter_name', selected_params
+    ) if selected_params else quality_df_clean
     
-    filtered_flow_df = flow_df[
-        flow_df['location_name'].isin(selected_locations)
-    ] if selected_locations else flow_df
+    filtered_flow_df = filter_by_category(
+        flow_df, 'location_name', selected_locations
+    ) if selected_locations else flow_df
     
     st.divider()
     
-    # Create analysis tabs
-    tab1, tab2, tab3, tab4 = st.tabs([
-        "📈 Trends", 
-        "📊 Statistics", 
-        "🔗 Correlations", 
-        "📍 Location Comparison"
-    ])
+    # Analysis views. st.tabs would compute and render all four on every
+    # rerun, so only the selected view is built.
+    active_view = st.radio(
+        "Analysis View",
+        ["📈 Trends", "📊 Statistics", "🔗 Correlations", "📍 Location Comparison"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="analytics_view"
+    )
     
-    with tab1:
-        render_parameter_trends(filtered_quality_df)
+    if active_view == "📈 Trends":
+        # Averaged in Postgres; fall back to pandas if the view is unavailable
+        daily_df = fetch_daily_quality_data(ANALYTICS_START, ANALYTICS_END)
+        if daily_df is None:
+            daily_df = daily_quality_means(quality_df_clean)
+        filtered_daily_df = filter_by_category(
+            daily_df, 'parameter_name', selected_params
+        ) if selected_params and not daily_df.empty else daily_df
+        render_parameter_trends(filtered_daily_df)
     
-    with tab2:
-        render_statistical_summary(filtered_quality_df)
+    elif active_view == "📊 Statistics":
+        stats_summary = fetch_param_stats(
+            ANALYTICS_START,
+            ANALYTICS_END,
+            tuple(sorted(selected_params)) if selected_params else None
+        )
+        render_statistical_summary(filtered_quality_df, stats_summary)
     
-    with tab3:
+    elif active_view == "🔗 Correlations":
         render_correlation_analysis(filtered_quality_df)
     
-    with tab4:
+    else:
         st.markdown("#### Parameter-Location Comparison")
         st.warning("Water quality parameters cannot be compared by location as location data is not available in the water_quality table.")
         render_flow_analysis(filtered_flow_df, selected_locations)
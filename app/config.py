@@ -29,4 +29,8 @@ CONFIG = {
         "STP (pH)": (6.5, 9.0),
         "STP (COD)": (1000, 3000)
     }
-}
\ No newline at end of file
+}
+
+# Safe range bounds keyed by parameter, for vectorized range checks
+SAFE_MIN_BY_PARAM = {param: bounds[0] for param, bounds in CONFIG["SAFE_RANGES"].items()}
+SAFE_MAX_BY_PARAM = {param: bounds[1] for param, bounds in CONFIG["SAFE_RANGES"].items()}
@@ -1,5 +1,4 @@
 import streamlit as st 
-import os 
 from dotenv import load_dotenv 
 from datetime import datetime
 
@@ -18,7 +17,6 @@ sys.path.append(str(Path(__file__).parent.parent / "analytics.chatbot"))
 from dashwork.dash import show_dashboard
 from analytics.stranalytics import show_analytics
 from analytics.chatbot import show_chatbot
-from app.config import CONFIG
 from dashwork.dash import show_alerts
 
 
@@ -34,35 +32,6 @@ st.set_page_config(
     initial_sidebar_state="expanded" 
 ) 
 
-# --- Configuration --- 
-CONFIG = { 
-    "SUPABASE_URL": os.getenv("SUPABASE_URL"), 
-    "SUPABASE_KEY": os.getenv("SUPABASE_ANON_KEY"), 
-    "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY"), 
-    "PARAMETERS": [ 
-        "HUMIDITY", "ETP (TDS)", "ETP (pH)", 
-        "STP (TDS)", "STP (TSS)", "STP (BOD)", 
-        "STP (pH)", "STP (COD)" 
-    ], 
-    "LOCATIONS": [ 
-        "Corporation Water", 
-        "Ground Water Source 1", 
-        "Ground Water Source 2", 
-        "Industrial Process", 
-        "Tanker Water Supply" 
-    ], 
-    "SAFE_RANGES": { 
-        "HUMIDITY": (30, 70), 
-        "ETP (TDS)": (100, 1000), 
-        "ETP (pH)": (6.5, 9.0), 
-        "STP (TDS)": (100, 1000), 
-        "STP (TSS)": (1000, 3000), 
-        "STP (BOD)": (0, 5), 
-        "STP (pH)": (6.5, 9.0), 
-        "STP (COD)": (1000, 3000) 
-    } 
-} 
-
 # --- CSS styling with updated header --- 
 st.markdown(""" 
 <style> 
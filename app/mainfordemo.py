@@ -4,14 +4,20 @@ import plotly.graph_objects as go
 import pandas as pd 
 import numpy as np 
 from supabase import create_client 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import ChatPromptTemplate 
-from langchain_core.output_parsers import StrOutputParser 
 import os 
 from dotenv import load_dotenv 
 from datetime import datetime, timedelta 
-import time 
 import random 
+import sys 
+from pathlib import Path 
+
+# Add the project root to Python's module search path 
+sys.path.append(str(Path(__file__).parent.parent)) 
+
+# The chatbot lives in analytics/chatbot.py; reuse it instead of keeping a copy here 
+from analytics.chatbot import show_chatbot 
+from app.streamlit_utils import in_parallel 
+from app.config import SAFE_MIN_BY_PARAM, SAFE_MAX_BY_PARAM 
 
 # --- Load environment variables --- 
 load_dotenv() 
@@ -57,8 +63,26 @@ CONFIG = {
     } 
 } 
 
-# --- CSS styling with updated header --- 
-st.markdown(""" 
+# Column dtypes for frames built from PostgREST rows; other columns are inferred. 
+# Readings are float32 and the low-cardinality names are categoricals. 
+COLUMN_DTYPES = { 
+    'id': 'int64', 
+    'value': 'float32', 
+    'totalizer': 'float32', 
+    'safe_min': 'float32', 
+    'safe_max': 'float32', 
+    'parameter_name': 'category', 
+    'location_name': 'category' 
+} 
+
+# Columns fetched per table; id and timestamp are always needed for keyset paging 
+FETCH_COLUMNS = { 
+    "water_quality": "id,timestamp,parameter_name,value", 
+    "flow_rate": "id,timestamp,location_name,totalizer" 
+} 
+
+# --- CSS styling with updated header; markup is built once at import and rendered from main --- 
+PAGE_CSS = """ 
 <style> 
     .main-header { 
         background: linear-gradient(90deg, #4facfe 0%, #00f2fe 100%); 
@@ -93,41 +117,95 @@ st.markdown("""
         margin-bottom: 20px; 
     } 
 </style> 
-""", unsafe_allow_html=True) 
+""" 
+
+MAIN_HEADER = """ 
+<div class="main-header"> 
+    <h1 style="color: white;">🌊 Water Management System</h1> 
+    <p style="color: white;">Real-time monitoring, analytics, and AI-powered insights for water quality management</p> 
+</div> 
+""" 
+
+METRIC_CARD = '<div class="metric-card">{icon} <b>{label}</b><br>{value}</div>' 
+
+PANEL_HEADERS = { 
+    "Dashboard": '<h2 class="panel-header">📊 Dashboard</h2>', 
+    "Analytics": '<h2 class="panel-header">📈 Analytics</h2>', 
+    "AI Query": '<h2 class="panel-header">🤖 AI Query</h2>', 
+    "Alerts": '<h2 class="panel-header">🚨 Alerts</h2>' 
+} 
 
 # --- Data fetching functions --- 
-def fetch_data_with_pagination(table_name, _supabase_client, start_date=None, end_date=None): 
+@st.cache_resource(show_spinner=False) 
+def get_supabase(): 
+    """Create the Supabase client once and share its connection pool across reruns and sessions""" 
+    return create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_ANON_KEY")) 
+
+def records_to_frame(records): 
+    """Build a DataFrame column by column with known dtypes instead of inferring them from a list of dicts""" 
+    if not records: 
+        return pd.DataFrame() 
+     
+    df = pd.DataFrame({ 
+        name: pd.Series([row[name] for row in records], dtype=COLUMN_DTYPES.get(name)) 
+        for name in records[0] 
+    }) 
+    if 'timestamp' in df.columns: 
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601') 
+    return df 
+
+def fetch_data_with_pagination(table_name, _supabase_client, start_date=None, end_date=None, columns=None): 
+    # Only the columns the panels use (plus id for keyset paging) by default 
+    columns = columns or FETCH_COLUMNS.get(table_name, '*') 
     all_data = [] 
     page_size = 1000 
-    offset = 0 
+    total = None 
+    last_row = None 
      
     while True: 
-        query = _supabase_client.table(table_name).select('*') 
+        # The first page also asks for the exact row count 
+        query = _supabase_client.table(table_name).select(columns, count='exact' if last_row is None else None) 
          
         if start_date: 
             query = query.gte('timestamp', start_date.isoformat()) 
         if end_date: 
             query = query.lte('timestamp', end_date.isoformat()) 
+         
+        # Keyset pagination: seek past the last (timestamp, id) seen rather 
+        # than using OFFSET, which makes Postgres walk every earlier row again 
+        if last_row is not None: 
+            last_ts, last_id = last_row['timestamp'], last_row['id'] 
+            query = query.or_(f'timestamp.gt."{last_ts}",and(timestamp.eq."{last_ts}",id.gt.{last_id})') 
              
-        query = query.range(offset, offset + page_size - 1).execute() 
+        query = query.order('timestamp').order('id').limit(page_size).execute() 
          
         page_data = query.data 
-        if not page_data: 
-            break 
+        if last_row is None: 
+            total = query.count 
          
         all_data.extend(page_data) 
-        offset += page_size 
          
-        if len(page_data) < page_size: 
+        # Stopping at the known total avoids an extra empty round-trip 
+        # when the last page happens to be full 
+        if len(page_data) < page_size or (total is not None and len(all_data) >= total): 
             break 
-             
-    return pd.DataFrame(all_data) 
+         
+        last_row = page_data[-1] 
+     
+    # Typed once here so callers don't re-coerce or re-parse 
+    return records_to_frame(all_data) 
 
+# The fetchers below hand out the same frame on every cache hit instead of 
+# a pickled copy, so callers must treat the results as read-only 
+@st.cache_resource(ttl=60, show_spinner=False) 
 def fetch_split_data(mode='historical'): 
-    supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_ANON_KEY")) 
+    supabase = get_supabase() 
      
-    all_flow_df = fetch_data_with_pagination('flow_rate', supabase) 
-    all_quality_df = fetch_data_with_pagination('water_quality', supabase) 
+    # The two tables are independent, so fetch them side by side 
+    all_flow_df, all_quality_df = in_parallel( 
+        lambda: fetch_data_with_pagination('flow_rate', supabase), 
+        lambda: fetch_data_with_pagination('water_quality', supabase) 
+    ) 
      
     if mode == 'historical': 
         flow_split_index = int(len(all_flow_df) * 0.8) 
@@ -146,168 +224,82 @@ def fetch_split_data(mode='historical'):
         flow_df = all_flow_df 
         quality_df = all_quality_df 
      
-    if not flow_df.empty: 
-        flow_df['totalizer'] = pd.to_numeric(flow_df['totalizer'], errors='coerce') 
-     
-    if not quality_df.empty: 
-        quality_df['value'] = pd.to_numeric(quality_df['value'], errors='coerce') 
-     
     return flow_df, quality_df 
 
+@st.cache_resource(ttl=60, show_spinner=False) 
 def fetch_recent_data(hours=24): 
     try: 
-        supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_ANON_KEY")) 
+        supabase = get_supabase() 
          
         end_time = datetime.now() 
         start_time = end_time - timedelta(hours=hours) 
          
-        quality_df = fetch_data_with_pagination('water_quality', supabase, start_time, end_time) 
-        flow_df = fetch_data_with_pagination('flow_rate', supabase, start_time, end_time) 
-
-        if not quality_df.empty: 
-            quality_df['value'] = pd.to_numeric(quality_df['value'], errors='coerce') 
-            quality_df.sort_values(by='timestamp', ascending=False, inplace=True) 
-             
-        if not flow_df.empty: 
-            flow_df['totalizer'] = pd.to_numeric(flow_df['totalizer'], errors='coerce') 
-            flow_df.sort_values(by='timestamp', ascending=False, inplace=True) 
+        # Both tables in one round trip via get_recent, already newest first 
+        try: 
+            recent = supabase.rpc('get_recent', { 
+                'start_ts': start_time.isoformat(), 
+                'end_ts': end_time.isoformat() 
+            }).execute().data 
+        except Exception: 
+            recent = None 
+         
+        if recent: 
+            return records_to_frame(recent['quality']), records_to_frame(recent['flow']) 
+         
+        # Fall back to paging each table when the RPC is unavailable 
+        def fetch_recent(table_name): 
+            df = fetch_data_with_pagination(table_name, supabase, start_time, end_time) 
+            if not df.empty: 
+                df.sort_values(by='timestamp', ascending=False, inplace=True) 
+            return df 
+         
+        # Fetch and prepare both tables concurrently 
+        quality_df, flow_df = in_parallel( 
+            lambda: fetch_recent('water_quality'), 
+            lambda: fetch_recent('flow_rate') 
+        ) 
          
         return quality_df, flow_df 
     except Exception as e: 
         st.error(f"Failed to fetch recent data: {e}") 
         return pd.DataFrame(), pd.DataFrame() 
 
-# --- Updated Chatbot class with strict table structure guidelines ---
-class WaterChatBot: 
-    def __init__(self): 
-        try: 
-            self.supabase = create_client(CONFIG["SUPABASE_URL"], CONFIG["SUPABASE_KEY"]) 
-            self.llm = ChatGoogleGenerativeAI(
-                model="gemini-1.5-flash",
-                google_api_key=CONFIG["GEMINI_API_KEY"],
-                temperature=0.3
-            ) 
-            self.prompt_template = ChatPromptTemplate.from_messages([
-                ("system", """
-                You are an expert water management system analyst with access to:
-                1. Water quality data (water_quality table)
-                2. Flow rate data (flow_rate table)
-                
-                Database Schema:
-                - water_quality: timestamp, parameter_name, value
-                - flow_rate: timestamp, location_name, totalizer
-                
-                Strict Guidelines:
-                1. Always check the database first for any query
-                2. For real-time alerts, refer to the alerts monitoring system
-                3. For historical data (June-July 2025), query the Supabase database
-                4. When presenting data, strictly follow these table formats:
-                   - For water quality data (only these columns):
-                     ```
-                     | Timestamp            | Parameter | Value | Status       |
-                     |----------------------|-----------|-------|--------------|
-                     | 2025-06-15 08:30:00 | pH        | 7.2   | Normal       |
-                     | 2025-06-15 09:45:00 | TDS       | 850   | Normal       |
-                     | 2025-06-15 10:15:00 | BOD       | 6.2   | Out of Range |
-                     ```
-                   - For flow data (only these columns):
-                     ```
-                     | Timestamp            | Location              | Totalizer |
-                     |----------------------|-----------------------|-----------|
-                     | 2025-06-15 08:30:00 | Ground Water Source 1 | 4500      |
-                     | 2025-06-15 09:45:00 | Industrial Process    | 3200      |
-                     ```
-                5. Never add columns that don't exist in the original tables
-                6. For quality data, mark status as:
-                   - "Normal" when within safe ranges
-                   - "Out of Range" when outside safe ranges
-                7. For flow data, only show the data without status indicators
-                8. Always include 6-7 representative entries in tables
-                9. Safe ranges for quality parameters:
-                   {safe_ranges}
-                """),
-                ("human", """
-                Question: {question}
-                
-                Current Alerts: {alerts}
-                
-                Data Context (CSV):
-                {context}
-                """)
-            ])
-            self.chain = self.prompt_template | self.llm | StrOutputParser() 
-        except Exception as e: 
-            st.error(f"Failed to initialize chatbot: {str(e)}") 
-            self.supabase = None 
-            self.llm = None 
-
-    def fetch_data(self, table, params=None, locations=None): 
-        if not self.supabase: 
-            return pd.DataFrame() 
-             
-        end_date = datetime(2025, 7, 1) 
-        start_date = datetime(2025, 6, 1) 
-        df = fetch_data_with_pagination(table, self.supabase, start_date, end_date) 
-
-        if params and not df.empty and 'parameter_name' in df.columns: 
-            df = df[df['parameter_name'].isin(params)] 
+@st.cache_resource(ttl=60, show_spinner=False) 
+def fetch_clean_historical(): 
+    """Historical split plus its cleaned quality rows, prepared once and shared by the dashboard and analytics panels""" 
+    flow_df, quality_df = fetch_split_data(mode='historical') 
+     
+    if {'value', 'parameter_name'}.issubset(quality_df.columns): 
+        quality_df_clean = quality_df.dropna(subset=['value', 'parameter_name']) 
+    else: 
+        quality_df_clean = quality_df 
          
-        if locations and not df.empty and 'location_name' in df.columns: 
-            df = df[df['location_name'].isin(locations)] 
-
-        return df 
-
-    def check_alerts(self): 
-        alerts = [] 
-        quality_df, _ = fetch_recent_data(hours=24)
-        
-        if not quality_df.empty: 
-            quality_df['value'] = pd.to_numeric(quality_df['value'], errors='coerce') 
-            quality_df.dropna(subset=['value'], inplace=True) 
+    return flow_df, quality_df, quality_df_clean 
 
-            for _, row in quality_df.iterrows(): 
-                param = row['parameter_name'] 
-                min_val, max_val = CONFIG["SAFE_RANGES"].get(param, (None, None)) 
-                if min_val and (row['value'] < min_val or row['value'] > max_val): 
-                    alerts.append(f"{param}: {row['value']} (Safe: {min_val}-{max_val})") 
-        return alerts 
-
-    def generate_response(self, question): 
-        if not self.llm or not self.supabase: 
-            return "❌ Chatbot is not properly initialized. Please check your API keys." 
-             
-        alerts = self.check_alerts() 
-        alert_status = "✅ All parameters normal" if not alerts else "\n".join(alerts) 
-        
-        # Format safe ranges for the prompt
-        safe_ranges = "\n".join([f"{k}: {v}" for k, v in CONFIG["SAFE_RANGES"].items()])
-         
-        # Determine which data to fetch based on question
-        if "flow" in question.lower() or "location" in question.lower(): 
-            df = self.fetch_data(CONFIG["TABLES"]["flow"])
-            if "recent" in question.lower() or "current" in question.lower():
-                df, _ = fetch_recent_data(hours=24)
-        else: 
-            params = [p for p in CONFIG["PARAMETERS"] if p.lower() in question.lower()] 
-            df = self.fetch_data(CONFIG["TABLES"]["quality"], params=params if params else None)
-            if "recent" in question.lower() or "current" in question.lower():
-                df, _ = fetch_recent_data(hours=24)
-         
-        if df.empty: 
-            return "No relevant data found for your query." 
-         
-        return self.chain.invoke({ 
-            "question": question, 
-            "context": df.to_csv(), 
-            "alerts": alert_status,
-            "safe_ranges": safe_ranges
-        }) 
+def fetch_daily_flow(start_date=None, end_date=None): 
+    """Daily flow totals per location, summed in Postgres by get_daily_flow; None if unavailable""" 
+    try: 
+        supabase = get_supabase() 
+        result = supabase.rpc('get_daily_flow', { 
+            'start_ts': start_date, 
+            'end_ts': end_date 
+        }).execute() 
+    except Exception: 
+        return None 
+     
+    if not result.data: 
+        return None 
+     
+    daily_flow = pd.DataFrame(result.data) 
+    daily_flow['date'] = pd.to_datetime(daily_flow['date'], format='ISO8601') 
+    daily_flow['totalizer'] = daily_flow['totalizer'].astype(float) 
+    return daily_flow 
 
 # --- Dashboard functions --- 
 def show_dashboard(): 
     st.title("🌊 Water Management Dashboard") 
     st.markdown('<div class="header">Performance Overview</div>', unsafe_allow_html=True) 
-    flow_df, quality_df = fetch_split_data(mode='historical') 
+    flow_df, quality_df, quality_df_clean = fetch_clean_historical() 
      
     if flow_df.empty and quality_df.empty: 
         st.warning("No data available. Please check your database connection.") 
@@ -317,16 +309,16 @@ def show_dashboard():
     col1, col2, col3, col4 = st.columns(4) 
     with col1: 
         total_flow = flow_df["totalizer"].sum() if not flow_df.empty and "totalizer" in flow_df.columns else 0 
-        st.markdown(f'<div class="metric-card">📊 <b>Total Flow</b><br>{total_flow:,.0f} L</div>', unsafe_allow_html=True) 
+        st.markdown(METRIC_CARD.format(icon="📊", label="Total Flow", value=f"{total_flow:,.0f} L"), unsafe_allow_html=True) 
     with col2: 
         avg_quality = quality_df["value"].mean() if not quality_df.empty and "value" in quality_df.columns else 0 
-        st.markdown(f'<div class="metric-card">🔍 <b>Avg. Quality Score</b><br>{avg_quality:.1f}</div>', unsafe_allow_html=True) 
+        st.markdown(METRIC_CARD.format(icon="🔍", label="Avg. Quality Score", value=f"{avg_quality:.1f}"), unsafe_allow_html=True) 
     with col3: 
         alerts_count = len(quality_df[quality_df["value"] > 1000]) if not quality_df.empty and "value" in quality_df.columns else 0 
-        st.markdown(f'<div class="metric-card">⚠️ <b>Alerts</b><br>{alerts_count} Critical</div>', unsafe_allow_html=True) 
+        st.markdown(METRIC_CARD.format(icon="⚠️", label="Alerts", value=f"{alerts_count} Critical"), unsafe_allow_html=True) 
     with col4: 
         active_locations = flow_df["location_name"].nunique() if not flow_df.empty and "location_name" in flow_df.columns else 0 
-        st.markdown(f'<div class="metric-card">🏭 <b>Active Locations</b><br>{active_locations} Sites</div>', unsafe_allow_html=True) 
+        st.markdown(METRIC_CARD.format(icon="🏭", label="Active Locations", value=f"{active_locations} Sites"), unsafe_allow_html=True) 
      
     st.divider() 
      
@@ -335,8 +327,12 @@ def show_dashboard():
      
     with tab1: 
         if not flow_df.empty and "timestamp" in flow_df.columns and "location_name" in flow_df.columns: 
-            flow_df['date'] = pd.to_datetime(flow_df['timestamp'], format='mixed').dt.date 
-            daily_flow = flow_df.groupby(['date', 'location_name'])['totalizer'].sum().reset_index() 
+            # Summed per day in Postgres up to the end of the historical split; 
+            # fall back to grouping the fetched rows if the RPC is unavailable 
+            daily_flow = fetch_daily_flow(end_date=flow_df['timestamp'].max().isoformat()) 
+            if daily_flow is None: 
+                flow_df = flow_df.assign(date=flow_df['timestamp'].dt.floor('D')) 
+                daily_flow = flow_df.groupby(['date', 'location_name'], observed=True)['totalizer'].sum().reset_index() 
              
             fig = px.line(daily_flow, x='date', y='totalizer', color='location_name', 
                           title='Daily Water Flow Trends',  
@@ -349,7 +345,6 @@ def show_dashboard():
     with tab2: 
         if not quality_df.empty and "parameter_name" in quality_df.columns: 
             st.markdown("#### Quality Parameter Analysis") 
-            quality_df_clean = quality_df.dropna(subset=['value']) 
              
             selected_params = st.multiselect( 
                 "Select Parameters for Analysis", 
@@ -360,8 +355,7 @@ def show_dashboard():
             filtered_quality_df = quality_df_clean[quality_df_clean['parameter_name'].isin(selected_params)] 
              
             if not filtered_quality_df.empty: 
-                quality_df_clean['date'] = pd.to_datetime(quality_df_clean['timestamp'], format='mixed').dt.date 
-                param_dist = filtered_quality_df['parameter_name'].value_counts().reset_index() 
+                param_dist = filtered_quality_df['parameter_name'].value_counts().loc[lambda counts: counts > 0].reset_index() 
                  
                 col1, col2 = st.columns(2) 
                 with col1: 
@@ -390,7 +384,7 @@ def show_dashboard():
             filtered_flow_df = flow_df[flow_df['location_name'].isin(selected_locations)] 
              
             if not filtered_flow_df.empty and "totalizer" in filtered_flow_df.columns: 
-                loc_summary = filtered_flow_df.groupby('location_name')['totalizer'].mean().reset_index() 
+                loc_summary = filtered_flow_df.groupby('location_name', observed=True)['totalizer'].mean().reset_index() 
                 loc_summary.columns = ['location_name', 'avg_value'] 
                 fig = px.bar(loc_summary, x='location_name', y='avg_value', 
                              title='Average Flow Values by Location', 
@@ -404,7 +398,7 @@ def show_dashboard():
 # --- Analytics panel --- 
 def show_analytics(): 
     st.markdown("### 📊 Advanced Analytics") 
-    flow_df, quality_df = fetch_split_data(mode='historical') 
+    flow_df, quality_df, quality_df_clean = fetch_clean_historical() 
      
     try: 
         if quality_df.empty and flow_df.empty: 
@@ -422,15 +416,6 @@ def show_analytics():
             st.error(f"Missing required columns in quality data: {', '.join(missing_columns)}")
             return
             
-        # Clean and validate data
-        quality_df_clean = quality_df.copy()
-        
-        # Convert value to numeric, handling errors
-        quality_df_clean['value'] = pd.to_numeric(quality_df_clean['value'], errors='coerce')
-        
-        # Drop rows with invalid values
-        quality_df_clean = quality_df_clean.dropna(subset=['value', 'parameter_name'])
-        
         if quality_df_clean.empty:
             st.warning("No valid data available after cleaning (all values were invalid)")
             return
@@ -469,8 +454,7 @@ def show_analytics():
         with tab1: 
             if not filtered_quality_df.empty: 
                 st.markdown("#### Parameter Trends Over Time") 
-                filtered_quality_df['datetime'] = pd.to_datetime(filtered_quality_df['timestamp'], format='mixed') 
-                fig = px.line(filtered_quality_df, x='datetime', y='value', color='parameter_name', 
+                fig = px.line(filtered_quality_df, x='timestamp', y='value', color='parameter_name', 
                               title='Selected Parameter Trends Over Time') 
                 st.plotly_chart(fig, use_container_width=True) 
             else: 
@@ -479,7 +463,7 @@ def show_analytics():
         with tab2: 
             if not filtered_quality_df.empty: 
                 st.markdown("#### Statistical Summary") 
-                stats_summary = filtered_quality_df.groupby('parameter_name')['value'].agg([ 
+                stats_summary = filtered_quality_df.groupby('parameter_name', observed=True)['value'].agg([ 
                     'count', 'mean', 'std', 'min', 'max', 'median' 
                 ]).round(2) 
                 stats_summary.columns = ['Count', 'Mean', 'Std Dev', 'Min', 'Max', 'Median'] 
@@ -514,11 +498,12 @@ def show_analytics():
         with tab3: 
             if not filtered_quality_df.empty and len(filtered_quality_df['parameter_name'].unique()) > 1: 
                 st.markdown("#### Parameter Correlations") 
-                pivot_data = filtered_quality_df.pivot_table( 
-                    index='timestamp', 
-                    columns='parameter_name', 
-                    values='value' 
-                ) 
+                # Readings pair up on their exact timestamp, as pivot_table did; 
+                # the groupby keys on datetime64 and category codes instead 
+                pivot_data = filtered_quality_df.groupby( 
+                    ['timestamp', 'parameter_name'], 
+                    observed=True 
+                )['value'].mean().unstack() 
                  
                 if len(pivot_data.columns) > 1: 
                     correlation_matrix = pivot_data.corr() 
@@ -540,7 +525,7 @@ def show_analytics():
              
             if not filtered_flow_df.empty and selected_locations: 
                 st.markdown("#### Average Flow Rate by Location") 
-                loc_summary = filtered_flow_df.groupby('location_name')['totalizer'].mean().reset_index() 
+                loc_summary = filtered_flow_df.groupby('location_name', observed=True)['totalizer'].mean().reset_index() 
                 fig = px.bar(loc_summary, x='location_name', y='totalizer', color='location_name', 
                              title='Average Flow Values by Location') 
                 st.plotly_chart(fig, use_container_width=True) 
@@ -563,6 +548,7 @@ def show_alerts():
     with col2: 
         if st.button("🔄 Refresh Now", use_container_width=True): 
             st.cache_data.clear() 
+            fetch_recent_data.clear() 
             st.rerun() 
      
     with col3: 
@@ -570,32 +556,43 @@ def show_alerts():
      
     st.divider() 
      
+    # Auto-refresh reruns only the alert feed on a timer, instead of sleeping 
+    # on the script thread and then rerunning the whole app 
+    st.fragment(run_every=10 if auto_refresh else None)(render_alert_feed)() 
+
+def render_alert_feed(): 
+    """Check recent readings against the safe ranges and list the violations""" 
     quality_df, _ = fetch_recent_data() 
      
     if quality_df.empty: 
         st.warning("No recent data available for alert monitoring.") 
         return 
      
-    quality_df['value'] = pd.to_numeric(quality_df['value'], errors='coerce') 
-    quality_df.dropna(subset=['value'], inplace=True) 
-     
-    current_alerts = [] 
-     
-    for _, row in quality_df.iterrows(): 
-        param = row['parameter_name'] 
-        value = row['value'] 
-        timestamp = pd.to_datetime(row['timestamp'], format='mixed') 
-         
-        if param in CONFIG["SAFE_RANGES"]: 
-            min_val, max_val = CONFIG["SAFE_RANGES"][param] 
-            if not (min_val <= value <= max_val): 
-                current_alerts.append({ 
-                    'timestamp': timestamp, 
-                    'parameter': param, 
-                    'value': value, 
-                    'safe_min': min_val, 
-                    'safe_max': max_val 
-                }) 
+    quality_df = quality_df.dropna(subset=['value']) 
+     
+    # Range-check every reading at once; parameters without a configured 
+    # range map to NaN and never count as out of range 
+    safe_min = quality_df['parameter_name'].map(SAFE_MIN_BY_PARAM).astype(float) 
+    safe_max = quality_df['parameter_name'].map(SAFE_MAX_BY_PARAM).astype(float) 
+    out_of_range = (quality_df['value'] < safe_min) | (quality_df['value'] > safe_max) 
+    violations = quality_df[out_of_range] 
+     
+    # Only the violating rows are turned into records for display; their 
+    # timestamps (parsed once at fetch) are formatted in a single pass 
+    current_alerts = [ 
+        { 
+            'time_str': time_str, 
+            'parameter': param, 
+            'value': value, 
+            'safe_min': CONFIG["SAFE_RANGES"][param][0], 
+            'safe_max': CONFIG["SAFE_RANGES"][param][1] 
+        } 
+        for time_str, param, value in zip( 
+            violations['timestamp'].dt.strftime("%Y-%m-%d %H:%M:%S"), 
+            violations['parameter_name'], 
+            violations['value'] 
+        ) 
+    ] 
      
     total_alerts = len(current_alerts) 
      
@@ -624,67 +621,20 @@ def show_alerts():
     if current_alerts: 
         st.markdown("#### 🚨 Current Out-of-Range Parameters") 
         for alert in current_alerts: 
-            time_str = alert['timestamp'].strftime("%Y-%m-%d %H:%M:%S") 
             st.warning(f""" 
             **{alert['parameter']}**: {alert['value']:.2f}   
             **Safe Range**: {alert['safe_min']}-{alert['safe_max']}   
-            **Time**: {time_str} 
+            **Time**: {alert['time_str']} 
             """) 
     else: 
         st.success("🎉 All parameters are within safe ranges") 
-     
-    if auto_refresh: 
-        time.sleep(10) 
-        st.rerun() 
-
-def show_chatbot(initial_question=None): 
-    if not all([CONFIG["SUPABASE_URL"], CONFIG["SUPABASE_KEY"], CONFIG["GEMINI_API_KEY"]]): 
-        st.error("Missing required environment variables for AI chatbot.") 
-        st.info("Please ensure SUPABASE_URL, SUPABASE_ANON_KEY, and GEMINI_API_KEY are set.") 
-        return 
-     
-    if "chatbot" not in st.session_state: 
-        with st.spinner("Initializing AI chatbot..."): 
-            st.session_state.chatbot = WaterChatBot() 
-     
-    chatbot = st.session_state.chatbot 
-     
-    if "chat_history" not in st.session_state: 
-        st.session_state.chat_history = [] 
-     
-    if initial_question and initial_question not in [msg["content"] for msg in st.session_state.chat_history]: 
-        st.session_state.chat_history.append({"role": "user", "content": initial_question}) 
-        with st.chat_message("user"): 
-            st.markdown(initial_question) 
-        response = chatbot.generate_response(initial_question) 
-        with st.chat_message("assistant"): 
-            st.markdown(response) 
-        st.session_state.chat_history.append({"role": "assistant", "content": response}) 
-     
-    for msg in st.session_state.chat_history: 
-        with st.chat_message(msg["role"]): 
-            st.markdown(msg["content"]) 
-     
-    if prompt := st.chat_input("Ask about water data..."): 
-        st.session_state.chat_history.append({"role": "user", "content": prompt}) 
-        with st.chat_message("user"): 
-            st.markdown(prompt) 
-        with st.chat_message("assistant"): 
-            with st.spinner("Analyzing..."): 
-                response = chatbot.generate_response(prompt) 
-                st.markdown(response) 
-        st.session_state.chat_history.append({"role": "assistant", "content": response}) 
 
 def main(): 
     if "data_mode" not in st.session_state: 
         st.session_state.data_mode = 'historical' 
      
-    st.markdown(""" 
-    <div class="main-header"> 
-        <h1 style="color: white;">🌊 Water Management System</h1> 
-        <p style="color: white;">Real-time monitoring, analytics, and AI-powered insights for water quality management</p> 
-    </div> 
-    """, unsafe_allow_html=True)
+    st.markdown(PAGE_CSS, unsafe_allow_html=True) 
+    st.markdown(MAIN_HEADER, unsafe_allow_html=True) 
      
     with st.sidebar: 
         st.markdown("### 🧭 Navigation") 
@@ -723,18 +673,15 @@ def main():
                 st.rerun() 
      
     with st.container(): 
+        st.markdown(PANEL_HEADERS[panel], unsafe_allow_html=True) 
         if panel == "Dashboard": 
-            st.markdown('<h2 class="panel-header">📊 Dashboard</h2>', unsafe_allow_html=True) 
             show_dashboard() 
         elif panel == "Analytics": 
-            st.markdown('<h2 class="panel-header">📈 Analytics</h2>', unsafe_allow_html=True) 
             show_analytics() 
         elif panel == "AI Query": 
-            st.markdown('<h2 class="panel-header">🤖 AI Query</h2>', unsafe_allow_html=True) 
             initial_query = st.session_state.pop("quick_query", None) 
             show_chatbot(initial_question=initial_query) 
         elif panel == "Alerts": 
-            st.markdown('<h2 class="panel-header">🚨 Alerts</h2>', unsafe_allow_html=True) 
             show_alerts() 
 
 if __name__ == "__main__": 
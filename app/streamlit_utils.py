@@ -0,0 +1,25 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# Upper bound on concurrent Supabase requests issued by one rerun
+MAX_FETCH_WORKERS = 8
+
+def in_parallel(*calls):
+    """Run zero-argument fetches on worker threads, returning results in call order"""
+    # Workers need the script context for st.error and the data caches
+    ctx = get_script_run_ctx()
+    
+    def run(call):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return call()
+    
+    with ThreadPoolExecutor(max_workers=min(len(calls), MAX_FETCH_WORKERS)) as executor:
+        return list(executor.map(run, calls))
+
+def categorize_names(df):
+    """Store the low-cardinality name columns as pandas categoricals"""
+    for col in ('parameter_name', 'location_name'):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
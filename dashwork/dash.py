@@ -1,16 +1,173 @@
 import streamlit as st 
 import plotly.express as px 
+import plotly.graph_objects as go
 import pandas as pd 
+import numpy as np
 from supabase import create_client 
 import os 
 from datetime import datetime, timedelta 
 from dotenv import load_dotenv
-from app.config import CONFIG
-import time
+from app.config import SAFE_MIN_BY_PARAM, SAFE_MAX_BY_PARAM
+from app.streamlit_utils import in_parallel
 
 # Initialize environment variables
 load_dotenv()
 
+# Rows requested per page. PostgREST may cap pages lower (Supabase's default
+# max-rows is 1000); fetch_table detects the cap from the first page.
+PAGE_SIZE = 5000
+
+# Columns the dashboard and alerts panels read from each table
+FETCH_COLUMNS = {
+    "water_quality": "timestamp,parameter_name,value",
+    "flow_rate": "timestamp,location_name,totalizer"
+}
+
+# Optional fixed start (an ISO date) for the dashboard window. By default the
+# window starts at each table's oldest reading, so the preloaded history stays
+# in view however long the simulator has been appending live rows
+HISTORY_START = os.getenv("DASHBOARD_HISTORY_START")
+
+@st.cache_resource(show_spinner=False)
+def get_supabase(supabase_url, supabase_key):
+    """Create the Supabase client once and share it across reruns and sessions"""
+    return create_client(supabase_url, supabase_key)
+
+def read_table(supabase, table_name, start_iso=None, end_iso=None, newest_first=False):
+    """Page through a table for the window [start_iso, end_iso)"""
+    def fetch_page(offset, page_size, count=None):
+        # Query builders mutate in place, so every page gets a fresh one
+        query = supabase.table(table_name).select(FETCH_COLUMNS.get(table_name, '*'), count=count)
+        
+        if start_iso:
+            query = query.gte('timestamp', start_iso)
+        if end_iso:
+            query = query.lt('timestamp', end_iso)
+        
+        # A stable order keeps concurrently fetched pages from overlapping;
+        # newest-first reads walk the timestamp index instead of sorting in pandas
+        if newest_first:
+            query = query.order('timestamp', desc=True).order('id', desc=True)
+        else:
+            query = query.order('id')
+        return query.range(offset, offset + page_size - 1).execute()
+    
+    # The first page also asks for the exact row count; windows that fit in
+    # one page need no further round trips
+    first_page = fetch_page(0, PAGE_SIZE, count='exact')
+    all_data = list(first_page.data)
+    total = first_page.count
+    # A short first page with more rows remaining means the server capped it
+    page_size = len(first_page.data) or PAGE_SIZE
+    
+    if total is not None:
+        # With the total known, request all remaining pages at once
+        offsets = range(page_size, total, page_size)
+        if offsets:
+            for page_data in in_parallel(*[lambda offset=offset: fetch_page(offset, page_size).data for offset in offsets]):
+                all_data.extend(page_data)
+    else:
+        # No count available: walk the pages until a short one comes back
+        offset = page_size
+        page_data = first_page.data
+        while len(page_data) == page_size:
+            page_data = fetch_page(offset, page_size).data
+            all_data.extend(page_data)
+            offset += page_size
+            
+    df = pd.DataFrame(all_data)
+    # Names repeat across thousands of rows, so store them as category codes,
+    # and parse timestamps once here rather than in every panel
+    for column in ('parameter_name', 'location_name'):
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    if 'timestamp' in df.columns:
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format='mixed', errors='coerce')
+    return df
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_table(_supabase, table_name, start_iso=None, end_iso=None, newest_first=False):
+    """read_table, cached per table and window for five minutes"""
+    return read_table(_supabase, table_name, start_iso, end_iso, newest_first)
+
+@st.cache_data(ttl=10, show_spinner=False)
+def fetch_live_table(_supabase, table_name, start_iso=None, end_iso=None, newest_first=False):
+    """read_table for the live alert feed, cached no longer than its 10-second refresh"""
+    return read_table(_supabase, table_name, start_iso, end_iso, newest_first)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_split_bounds(_supabase, table_name, historical_fraction=0.8):
+    """Return (start, cutoff) ISO timestamps for a table's dashboard window.
+    
+    The window runs from HISTORY_START, or the oldest reading, to the newest; the
+    cutoff is the timestamp below which historical_fraction of the window's rows
+    fall. Both are found with index lookups instead of downloading the rows.
+    """
+    if HISTORY_START:
+        start = pd.Timestamp(HISTORY_START)
+    else:
+        oldest = _supabase.table(table_name).select('timestamp').order('timestamp').limit(1).execute()
+        if not oldest.data:
+            return None
+        start = pd.to_datetime(oldest.data[0]['timestamp'], format='mixed')
+    
+    # The start is floored to the day so it stays a stable cache key
+    start_iso = start.floor('D').isoformat()
+    
+    counted = _supabase.table(table_name).select('id', count='exact').gte('timestamp', start_iso).limit(1).execute()
+    split_offset = int((counted.count or 0) * historical_fraction)
+    
+    cutoff_row = (
+        _supabase.table(table_name).select('timestamp').gte('timestamp', start_iso)
+        .order('timestamp').range(split_offset, split_offset).execute()
+    )
+    if not cutoff_row.data:
+        return start_iso, None
+    
+    # Hour granularity keeps the historical slice's cache key steady under live inserts
+    cutoff = pd.to_datetime(cutoff_row.data[0]['timestamp'], format='mixed').floor('h')
+    return start_iso, cutoff.isoformat()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_daily_flow_totals(_supabase, start_iso=None, end_iso=None):
+    """Daily flow totals per location from get_daily_flow, cached per window for
+    five minutes; None when the RPC is unavailable so callers can aggregate locally"""
+    try:
+        result = _supabase.rpc('get_daily_flow', {
+            'start_ts': start_iso,
+            'end_ts': end_iso
+        }).execute()
+    except Exception:
+        return None
+        
+    if not result.data:
+        return None
+        
+    daily_flow = pd.DataFrame(result.data)
+    daily_flow['date'] = pd.to_datetime(daily_flow['date'], format='ISO8601')
+    daily_flow['totalizer'] = pd.to_numeric(daily_flow['totalizer'], errors='coerce')
+    return daily_flow
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_param_count_rows(_supabase, start_iso=None, end_iso=None, params=None):
+    """Reading counts per parameter from quality_param_counts, cached per window and
+    parameter selection for five minutes; None when the RPC is unavailable"""
+    try:
+        result = _supabase.rpc('quality_param_counts', {
+            'start_ts': start_iso,
+            'end_ts': end_iso,
+            'params': list(params) if params else None
+        }).execute()
+    except Exception:
+        return None
+        
+    if not result.data:
+        return None
+        
+    param_counts = pd.DataFrame(result.data)
+    param_counts['count'] = param_counts['count'].astype(int)
+    return param_counts
+
 class DashboardManager:
     def __init__(self):
         self.supabase = None
@@ -26,43 +183,25 @@ class DashboardManager:
             if not supabase_url or not supabase_key:
                 raise ValueError("Supabase credentials not configured")
                 
-            self.supabase = create_client(supabase_url, supabase_key)
+            self.supabase = get_supabase(supabase_url, supabase_key)
             self.initialized = True
         except Exception as e:
             self.init_error = str(e)
             self.initialized = False
 
-    def fetch_data_with_pagination(self, table_name, start_date=None, end_date=None):
+    def fetch_data_with_pagination(self, table_name, start_date=None, end_date=None, newest_first=False, live=False):
         """Fetch paginated data with error handling"""
         if not self.initialized:
             return pd.DataFrame()
             
-        all_data = []
-        page_size = 1000
-        offset = 0
-        
         try:
-            while True:
-                query = self.supabase.table(table_name).select('*')
-                
-                if start_date:
-                    query = query.gte('timestamp', start_date.isoformat())
-                if end_date:
-                    query = query.lte('timestamp', end_date.isoformat())
-                    
-                result = query.range(offset, offset + page_size - 1).execute()
-                page_data = result.data
-                
-                if not page_data:
-                    break
-                    
-                all_data.extend(page_data)
-                offset += page_size
-                
-                if len(page_data) < page_size:
-                    break
-                    
-            return pd.DataFrame(all_data)
+            return (fetch_live_table if live else fetch_table)(
+                self.supabase,
+                table_name,
+                start_date.isoformat() if start_date else None,
+                end_date.isoformat() if end_date else None,
+                newest_first
+            )
         except Exception as e:
             st.error(f"Data fetch error: {str(e)}")
             return pd.DataFrame()
@@ -73,22 +212,29 @@ class DashboardManager:
             return pd.DataFrame(), pd.DataFrame()
             
         try:
-            all_flow_df = self.fetch_data_with_pagination('flow_rate')
-            all_quality_df = self.fetch_data_with_pagination('water_quality')
+            def fetch_slice(table_name):
+                # The historical/live split is a time cutoff found in the database at
+                # 80% of the window's rows, and the window spans the whole table by
+                # default, so it lands where the old in-memory iloc split did. Each
+                # mode downloads only its own slice
+                bounds = fetch_split_bounds(self.supabase, table_name)
+                if bounds is None:
+                    return pd.DataFrame()
+                start_iso, cutoff_iso = bounds
+                
+                if mode == 'historical':
+                    start_iso, end_iso = start_iso, cutoff_iso
+                elif mode == 'live':
+                    start_iso, end_iso = cutoff_iso or start_iso, None
+                else:
+                    end_iso = None
+                return fetch_table(self.supabase, table_name, start_iso, end_iso)
             
-            if mode == 'historical':
-                flow_split_index = int(len(all_flow_df) * 0.8)
-                quality_split_index = int(len(all_quality_df) * 0.8)
-                flow_df = all_flow_df.iloc[:flow_split_index]
-                quality_df = all_quality_df.iloc[:quality_split_index]
-            elif mode == 'live':
-                flow_split_index = int(len(all_flow_df) * 0.8)
-                quality_split_index = int(len(all_quality_df) * 0.8)
-                flow_df = all_flow_df.iloc[flow_split_index:]
-                quality_df = all_quality_df.iloc[quality_split_index:]
-            else:
-                flow_df = all_flow_df
-                quality_df = all_quality_df
+            # The two tables are independent, so fetch them side by side
+            flow_df, quality_df = in_parallel(
+                lambda: fetch_slice('flow_rate'),
+                lambda: fetch_slice('water_quality')
+            )
             
             # Clean data
             if not flow_df.empty:
@@ -102,43 +248,118 @@ class DashboardManager:
             st.error(f"Data processing error: {str(e)}")
             return pd.DataFrame(), pd.DataFrame()
 
+    def fetch_daily_flow(self, start_date=None, end_date=None):
+        """Fetch daily flow totals per location, summed in Postgres by get_daily_flow"""
+        if not self.initialized:
+            return None
+        return fetch_daily_flow_totals(
+            self.supabase,
+            start_date.isoformat() if start_date else None,
+            end_date.isoformat() if end_date else None
+        )
+
+    def fetch_param_counts(self, start_date=None, end_date=None, params=None):
+        """Fetch reading counts per parameter, counted in Postgres by quality_param_counts"""
+        if not self.initialized:
+            return None
+        return fetch_param_count_rows(
+            self.supabase,
+            start_date.isoformat() if start_date else None,
+            end_date.isoformat() if end_date else None,
+            tuple(sorted(params)) if params else None
+        )
+
+    def kpis(self, flow_df, quality_df):
+        """Compute the overview KPI numbers in one pass over each frame"""
+        kpis = {'total_flow': 0, 'active_locations': 0, 'avg_quality': 0, 'alerts_count': 0}
+        
+        if not flow_df.empty and "totalizer" in flow_df.columns and "location_name" in flow_df.columns:
+            flow_stats = flow_df.agg({'totalizer': 'sum', 'location_name': 'nunique'})
+            kpis['total_flow'] = flow_stats['totalizer']
+            kpis['active_locations'] = int(flow_stats['location_name'])
+            
+        if not quality_df.empty and "value" in quality_df.columns:
+            values = quality_df['value']
+            kpis['avg_quality'] = values.mean()
+            # Count readings over the critical level without building a filtered frame
+            kpis['alerts_count'] = int((values > 1000).sum())
+            
+        return kpis
+
     def fetch_recent_data(self, hours=24):
         """Fetch recent data with error handling"""
         if not self.initialized:
             return pd.DataFrame(), pd.DataFrame()
             
         try:
-            end_time = datetime.now()
-            start_time = end_time - timedelta(hours=hours)
+            # The window is left open-ended so the newest readings are always
+            # included; the start is floored to the minute so refreshes within
+            # a minute share a (short-lived) cache entry
+            start_time = datetime.now().replace(second=0, microsecond=0) - timedelta(hours=hours)
             
-            quality_df = self.fetch_data_with_pagination('water_quality', start_time, end_time)
-            flow_df = self.fetch_data_with_pagination('flow_rate', start_time, end_time)
+            quality_df, flow_df = in_parallel(
+                lambda: self.fetch_data_with_pagination('water_quality', start_time, newest_first=True, live=True),
+                lambda: self.fetch_data_with_pagination('flow_rate', start_time, newest_first=True, live=True)
+            )
 
             if not quality_df.empty:
                 quality_df['value'] = pd.to_numeric(quality_df['value'], errors='coerce')
-                quality_df.sort_values(by='timestamp', ascending=False, inplace=True)
                 
             if not flow_df.empty:
                 flow_df['totalizer'] = pd.to_numeric(flow_df['totalizer'], errors='coerce')
-                flow_df.sort_values(by='timestamp', ascending=False, inplace=True)
                 
             return quality_df, flow_df
         except Exception as e:
             st.error(f"Recent data fetch error: {str(e)}")
             return pd.DataFrame(), pd.DataFrame()
 
+def build_box_figure(quality_df):
+    """Box plot per parameter from precomputed quartiles, so the browser gets
+    five numbers per box instead of every reading"""
+    grouped = quality_df.groupby('parameter_name', observed=True)['value']
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats['min'] = grouped.min()
+    stats['max'] = grouped.max()
+    iqr = stats[0.75] - stats[0.25]
+    # Whiskers at 1.5 IQR, clipped to the observed range
+    lowerfence = (stats[0.25] - 1.5 * iqr).clip(lower=stats['min'])
+    upperfence = (stats[0.75] + 1.5 * iqr).clip(upper=stats['max'])
+    
+    fig = go.Figure(go.Box(
+        x=stats.index.astype(str),
+        q1=stats[0.25],
+        median=stats[0.5],
+        q3=stats[0.75],
+        lowerfence=lowerfence,
+        upperfence=upperfence,
+        name='value'
+    ))
+    fig.update_layout(title='Parameter Value Distribution',
+                      xaxis_title='parameter_name', yaxis_title='value')
+    return fig
+
+@st.cache_resource(show_spinner="Initializing dashboard...")
+def get_dashboard_manager():
+    """Create and initialize one DashboardManager shared by every session"""
+    dm = DashboardManager()
+    dm.initialize()
+    return dm
+
+def load_dashboard_manager():
+    """Return the shared manager, or report why it could not be initialized"""
+    dm = get_dashboard_manager()
+    if not dm.initialized:
+        # Don't keep a failed manager around; the next rerun retries
+        get_dashboard_manager.clear()
+        st.error(f"Dashboard initialization failed: {dm.init_error}")
+        return None
+    return dm
+
 def show_dashboard():
     """Display the main dashboard"""
-    if "dashboard_manager" not in st.session_state:
-        st.session_state.dashboard_manager = DashboardManager()
-        with st.spinner("Initializing dashboard..."):
-            st.session_state.dashboard_manager.initialize()
-        
-        if not st.session_state.dashboard_manager.initialized:
-            st.error(f"Dashboard initialization failed: {st.session_state.dashboard_manager.init_error}")
-            return
-    
-    dm = st.session_state.dashboard_manager
+    dm = load_dashboard_manager()
+    if dm is None:
+        return
     flow_df, quality_df = dm.fetch_split_data(mode='historical')
     
     if flow_df.empty and quality_df.empty:
@@ -150,19 +371,16 @@ def show_dashboard():
     st.markdown('<div class="header">Performance Overview</div>', unsafe_allow_html=True)
     
     # KPI Cards
+    kpis = dm.kpis(flow_df, quality_df)
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        total_flow = flow_df["totalizer"].sum() if not flow_df.empty and "totalizer" in flow_df.columns else 0
-        st.markdown(f'<div class="metric-card">📊 <b>Total Flow</b><br>{total_flow:,.0f} L</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-card">📊 <b>Total Flow</b><br>{kpis["total_flow"]:,.0f} L</div>', unsafe_allow_html=True)
     with col2:
-        avg_quality = quality_df["value"].mean() if not quality_df.empty and "value" in quality_df.columns else 0
-        st.markdown(f'<div class="metric-card">🔍 <b>Avg. Quality Score</b><br>{avg_quality:.1f}</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-card">🔍 <b>Avg. Quality Score</b><br>{kpis["avg_quality"]:.1f}</div>', unsafe_allow_html=True)
     with col3:
-        alerts_count = len(quality_df[quality_df["value"] > 1000]) if not quality_df.empty and "value" in quality_df.columns else 0
-        st.markdown(f'<div class="metric-card">⚠️ <b>Alerts</b><br>{alerts_count} Critical</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-card">⚠️ <b>Alerts</b><br>{kpis["alerts_count"]} Critical</div>', unsafe_allow_html=True)
     with col4:
-        active_locations = flow_df["location_name"].nunique() if not flow_df.empty and "location_name" in flow_df.columns else 0
-        st.markdown(f'<div class="metric-card">🏭 <b>Active Locations</b><br>{active_locations} Sites</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-card">🏭 <b>Active Locations</b><br>{kpis["active_locations"]} Sites</div>', unsafe_allow_html=True)
     
     st.divider()
     
@@ -171,13 +389,20 @@ def show_dashboard():
     
     with tab1:
         if not flow_df.empty and "timestamp" in flow_df.columns and "location_name" in flow_df.columns:
-            flow_df['date'] = pd.to_datetime(flow_df['timestamp'], format='mixed').dt.date
-            daily_flow = flow_df.groupby(['date', 'location_name'])['totalizer'].sum().reset_index()
+            # Daily totals come pre-aggregated from Postgres over the same span as
+            # the historical slice; the local groupby is only a fallback
+            daily_flow = dm.fetch_daily_flow(flow_df['timestamp'].min(), flow_df['timestamp'].max())
+            if daily_flow is None:
+                # Day buckets stay datetime64 so the groupby runs on int64 keys
+                # rather than hashing Python date objects
+                flow_df['date'] = flow_df['timestamp'].dt.floor('D')
+                daily_flow = flow_df.groupby(['date', 'location_name'], observed=True)['totalizer'].sum().reset_index()
             
             fig = px.line(daily_flow, x='date', y='totalizer', color='location_name',
                         title='Daily Water Flow Trends',
                         labels={'totalizer': 'Flow Rate (L)', 'date': 'Date'},
-                        height=500)
+                        height=500, render_mode='webgl')
+            fig.update_layout(hovermode='x', spikedistance=0)
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("No flow data available")
@@ -196,8 +421,13 @@ def show_dashboard():
             filtered_quality_df = quality_df_clean[quality_df_clean['parameter_name'].isin(selected_params)]
             
             if not filtered_quality_df.empty:
-                quality_df_clean['date'] = pd.to_datetime(quality_df_clean['timestamp'], format='mixed').dt.date
-                param_dist = filtered_quality_df['parameter_name'].value_counts().reset_index()
+                # The pie only needs one count per parameter, so let Postgres count
+                # over the same window; value_counts is the fallback
+                param_dist = dm.fetch_param_counts(
+                    quality_df['timestamp'].min(), quality_df['timestamp'].max(), selected_params
+                )
+                if param_dist is None:
+                    param_dist = filtered_quality_df['parameter_name'].value_counts().loc[lambda counts: counts > 0].reset_index()
                 
                 col1, col2 = st.columns(2)
                 with col1:
@@ -206,8 +436,7 @@ def show_dashboard():
                     st.plotly_chart(fig, use_container_width=True)
                 
                 with col2:
-                    fig = px.box(filtered_quality_df, x='parameter_name', y='value',
-                                title='Parameter Value Distribution')
+                    fig = build_box_figure(filtered_quality_df)
                     st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("No data available for the selected parameters.")
@@ -226,7 +455,7 @@ def show_dashboard():
             filtered_flow_df = flow_df[flow_df['location_name'].isin(selected_locations)]
             
             if not filtered_flow_df.empty and "totalizer" in filtered_flow_df.columns:
-                loc_summary = filtered_flow_df.groupby('location_name')['totalizer'].mean().reset_index()
+                loc_summary = filtered_flow_df.groupby('location_name', observed=True)['totalizer'].mean().reset_index()
                 loc_summary.columns = ['location_name', 'avg_value']
                 fig = px.bar(loc_summary, x='location_name', y='avg_value',
                             title='Average Flow Values by Location',
@@ -239,16 +468,9 @@ def show_dashboard():
 
 def show_alerts():
     """Display the alerts monitoring panel"""
-    if "dashboard_manager" not in st.session_state:
-        st.session_state.dashboard_manager = DashboardManager()
-        with st.spinner("Initializing dashboard..."):
-            st.session_state.dashboard_manager.initialize()
-        
-        if not st.session_state.dashboard_manager.initialized:
-            st.error(f"Dashboard initialization failed: {st.session_state.dashboard_manager.init_error}")
-            return
-    
-    dm = st.session_state.dashboard_manager
+    dm = load_dashboard_manager()
+    if dm is None:
+        return
     
     st.markdown("### 🚨 Real-time Alert Monitoring")
     
@@ -260,13 +482,20 @@ def show_alerts():
     
     with col2:
         if st.button("🔄 Refresh Now", use_container_width=True):
-            st.rerun()
+            fetch_table.clear()
+            fetch_live_table.clear()
     
     with col3:
         auto_refresh = st.checkbox("🔃 Auto-refresh (10s)", value=False, key="alerts_auto_refresh")
     
     st.divider()
     
+    # Auto-refresh reruns only the alert feed on a timer, instead of sleeping
+    # on the script thread and then rerunning the whole app
+    st.fragment(run_every=10 if auto_refresh else None)(render_alert_feed)(dm)
+
+def render_alert_feed(dm):
+    """Check recent readings against the safe ranges and list the violations"""
     quality_df, _ = dm.fetch_recent_data()
     
     if quality_df.empty:
@@ -276,23 +505,33 @@ def show_alerts():
     quality_df['value'] = pd.to_numeric(quality_df['value'], errors='coerce')
     quality_df.dropna(subset=['value'], inplace=True)
     
-    current_alerts = []
+    # Range-check every reading at once: look the bounds up per category and
+    # gather them by category code. Parameters without a configured range get
+    # NaN bounds and never count as out of range.
+    names = quality_df['parameter_name'].cat
+    safe_min = np.array([SAFE_MIN_BY_PARAM.get(p, np.nan) for p in names.categories], dtype=float)
+    safe_max = np.array([SAFE_MAX_BY_PARAM.get(p, np.nan) for p in names.categories], dtype=float)
+    codes = names.codes.to_numpy()
+    values = quality_df['value'].to_numpy()
+    out_of_range = (values < safe_min[codes]) | (values > safe_max[codes])
+    violations = quality_df[out_of_range]
     
-    for _, row in quality_df.iterrows():
-        param = row['parameter_name']
-        value = row['value']
-        timestamp = pd.to_datetime(row['timestamp'], format='mixed')
-        
-        if param in CONFIG["SAFE_RANGES"]:
-            min_val, max_val = CONFIG["SAFE_RANGES"][param]
-            if not (min_val <= value <= max_val):
-                current_alerts.append({
-                    'timestamp': timestamp,
-                    'parameter': param,
-                    'value': value,
-                    'safe_min': min_val,
-                    'safe_max': max_val
-                })
+    # Only the violating rows are turned into alert records; their timestamps
+    # (parsed once at fetch) are formatted in a single pass
+    current_alerts = [
+        {
+            'time_str': time_str,
+            'parameter': param,
+            'value': value,
+            'safe_min': SAFE_MIN_BY_PARAM[param],
+            'safe_max': SAFE_MAX_BY_PARAM[param]
+        }
+        for time_str, param, value in zip(
+            violations['timestamp'].dt.strftime("%Y-%m-%d %H:%M:%S"),
+            violations['parameter_name'],
+            violations['value']
+        )
+    ]
     
     total_alerts = len(current_alerts)
     
@@ -321,18 +560,13 @@ def show_alerts():
     if current_alerts:
         st.markdown("#### 🚨 Current Out-of-Range Parameters")
         for alert in current_alerts:
-            time_str = alert['timestamp'].strftime("%Y-%m-%d %H:%M:%S")
             st.warning(f"""
             **{alert['parameter']}**: {alert['value']:.2f}   
             **Safe Range**: {alert['safe_min']}-{alert['safe_max']}   
-            **Time**: {time_str}
+            **Time**: {alert['time_str']}
             """)
     else:
         st.success("🎉 All parameters are within safe ranges")
-    
-    if auto_refresh:
-        time.sleep(10)
-        st.rerun()
 
 # For testing the component standalone
 if __name__ == "__main__":
@@ -4,6 +4,7 @@
 -- Drop tables if they exist (for reinitialization)
 DROP TABLE IF EXISTS flow_rate;
 DROP TABLE IF EXISTS water_quality;
+DROP TABLE IF EXISTS parameter_safe_ranges;
 
 -- Table for Flow Rate Data
 CREATE TABLE flow_rate (
@@ -42,6 +43,42 @@ CREATE TABLE water_quality (
     safe_max NUMERIC(10, 3)
 );
 
+-- Safe range per parameter, stored once rather than on every reading.
+-- The real-time simulator upserts it at start-up and leaves safe_min and
+-- safe_max on water_quality null; join on parameter_name to get a
+-- reading's range
+CREATE TABLE parameter_safe_ranges (
+    parameter_name VARCHAR(50) PRIMARY KEY,
+    safe_min NUMERIC(10, 3) NOT NULL,
+    safe_max NUMERIC(10, 3) NOT NULL
+);
+
+INSERT INTO parameter_safe_ranges (parameter_name, safe_min, safe_max)
+VALUES
+    ('HUMIDITY', 30, 70),
+    ('ETP (TDS)', 100, 1000),
+    ('ETP (pH)', 6.5, 9),
+    ('STP (TDS)', 100, 1000),
+    ('STP (TSS)', 1000, 3000),
+    ('STP (BOD)', 0, 5),
+    ('STP (pH)', 6.5, 9),
+    ('STP (COD)', 1000, 3000);
+
+-- Covering indexes for the time-window reads done by the dashboard,
+-- analytics and chatbot: range scans on timestamp with the name filter
+-- and the measured value served straight from the index (index-only scan).
+-- On an existing database run these with CREATE INDEX CONCURRENTLY.
+CREATE INDEX IF NOT EXISTS idx_water_quality_ts_param
+    ON water_quality (timestamp DESC, parameter_name) INCLUDE (value);
+
+CREATE INDEX IF NOT EXISTS idx_flow_rate_ts_location
+    ON flow_rate (timestamp DESC, location_name) INCLUDE (totalizer);
+
+-- Parameter-first index for reads that filter on a set of parameters
+-- over a time window (analytics statistics, get_param_stats)
+CREATE INDEX IF NOT EXISTS idx_water_quality_param_ts
+    ON water_quality (parameter_name, timestamp);
+
 -- Insert safe range reference values for parameters
 INSERT INTO water_quality (timestamp, parameter_name, value, safe_min, safe_max)
 VALUES
@@ -53,3 +90,227 @@ VALUES
     ('2000-01-01 00:00:00', 'STP (BOD)', 0, 0, 5),
     ('2000-01-01 00:00:00', 'STP (pH)', 0, 6.5, 9),
     ('2000-01-01 00:00:00', 'STP (COD)', 0, 1000, 3000);
+
+-- Per-parameter statistics for a time window, aggregated server-side so
+-- clients can call it through PostgREST (rpc/water_quality_summary)
+-- instead of downloading every raw reading
+CREATE OR REPLACE FUNCTION water_quality_summary(
+    start_ts TIMESTAMP,
+    end_ts TIMESTAMP DEFAULT NULL,
+    params TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+    parameter_name VARCHAR(50),
+    avg_value NUMERIC,
+    min_value NUMERIC,
+    max_value NUMERIC,
+    readings BIGINT,
+    last_value NUMERIC,
+    last_timestamp TIMESTAMP
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        wq.parameter_name,
+        ROUND(AVG(wq.value), 3),
+        MIN(wq.value),
+        MAX(wq.value),
+        COUNT(*),
+        (ARRAY_AGG(wq.value ORDER BY wq.timestamp DESC))[1],
+        MAX(wq.timestamp)
+    FROM water_quality wq
+    WHERE wq.timestamp >= start_ts
+      AND (end_ts IS NULL OR wq.timestamp <= end_ts)
+      AND (params IS NULL OR wq.parameter_name = ANY(params))
+    GROUP BY wq.parameter_name
+    ORDER BY wq.parameter_name;
+$$;
+
+-- Daily mean per parameter for the analytics trend chart, so the client
+-- receives one row per day and parameter instead of every raw reading.
+-- water_quality has no location column, so buckets are per parameter only.
+CREATE OR REPLACE VIEW water_quality_daily AS
+    SELECT
+        date_trunc('day', timestamp)::date AS day,
+        parameter_name,
+        ROUND(AVG(value), 3) AS value
+    FROM water_quality
+    GROUP BY 1, 2;
+
+-- Descriptive statistics per parameter for the analytics Statistics tab,
+-- computed in Postgres rather than in pandas over downloaded rows
+CREATE OR REPLACE FUNCTION get_param_stats(
+    start_ts TIMESTAMP,
+    end_ts TIMESTAMP DEFAULT NULL,
+    params TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+    parameter_name VARCHAR(50),
+    readings BIGINT,
+    mean NUMERIC,
+    std_dev NUMERIC,
+    min_value NUMERIC,
+    max_value NUMERIC,
+    median DOUBLE PRECISION
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        wq.parameter_name,
+        COUNT(*),
+        AVG(wq.value),
+        STDDEV_SAMP(wq.value),
+        MIN(wq.value),
+        MAX(wq.value),
+        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY wq.value)
+    FROM water_quality wq
+    WHERE wq.timestamp >= start_ts
+      AND (end_ts IS NULL OR wq.timestamp <= end_ts)
+      AND (params IS NULL OR wq.parameter_name = ANY(params))
+    GROUP BY wq.parameter_name
+    ORDER BY wq.parameter_name;
+$$;
+
+-- Average flow per location for the analytics Location Comparison chart,
+-- so the client receives one row per location instead of every reading
+CREATE OR REPLACE FUNCTION get_flow_by_location(
+    start_ts TIMESTAMP,
+    end_ts TIMESTAMP DEFAULT NULL,
+    locations TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+    location_name VARCHAR(100),
+    totalizer NUMERIC
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        fr.location_name,
+        AVG(fr.totalizer)
+    FROM flow_rate fr
+    WHERE fr.timestamp >= start_ts
+      AND (end_ts IS NULL OR fr.timestamp <= end_ts)
+      AND (locations IS NULL OR fr.location_name = ANY(locations))
+    GROUP BY fr.location_name
+    ORDER BY fr.location_name;
+$$;
+
+-- Total and average flow per location for the chatbot's canned flow
+-- answers, so both are computed over the same window in one aggregate
+CREATE OR REPLACE FUNCTION get_flow_totals(
+    start_ts TIMESTAMP,
+    end_ts TIMESTAMP DEFAULT NULL,
+    locations TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+    location_name VARCHAR(100),
+    total_flow NUMERIC,
+    avg_flow NUMERIC
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        fr.location_name,
+        SUM(fr.totalizer),
+        AVG(fr.totalizer)
+    FROM flow_rate fr
+    WHERE fr.timestamp >= start_ts
+      AND (end_ts IS NULL OR fr.timestamp <= end_ts)
+      AND (locations IS NULL OR fr.location_name = ANY(locations))
+    GROUP BY fr.location_name
+    ORDER BY fr.location_name;
+$$;
+
+-- Daily flow totals per location for the dashboard trend chart
+CREATE OR REPLACE FUNCTION get_daily_flow(
+    start_ts TIMESTAMP DEFAULT NULL,
+    end_ts TIMESTAMP DEFAULT NULL
+)
+RETURNS TABLE (
+    date DATE,
+    location_name VARCHAR(100),
+    totalizer NUMERIC
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        date_trunc('day', fr.timestamp)::date,
+        fr.location_name,
+        SUM(fr.totalizer)
+    FROM flow_rate fr
+    WHERE (start_ts IS NULL OR fr.timestamp >= start_ts)
+      AND (end_ts IS NULL OR fr.timestamp <= end_ts)
+    GROUP BY 1, 2
+    ORDER BY 1, 2;
+$$;
+
+-- Reading counts per parameter for the dashboard's parameter distribution
+-- chart, so the client receives one row per parameter
+CREATE OR REPLACE FUNCTION quality_param_counts(
+    start_ts TIMESTAMP DEFAULT NULL,
+    end_ts TIMESTAMP DEFAULT NULL,
+    params TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+    parameter_name VARCHAR(50),
+    count BIGINT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        wq.parameter_name,
+        COUNT(*)
+    FROM water_quality wq
+    WHERE (start_ts IS NULL OR wq.timestamp >= start_ts)
+      AND (end_ts IS NULL OR wq.timestamp <= end_ts)
+      AND (params IS NULL OR wq.parameter_name = ANY(params))
+    GROUP BY wq.parameter_name
+    ORDER BY wq.parameter_name;
+$$;
+
+-- Both tables' readings for a recent window in one call, newest first, so
+-- the alerts panel needs a single round trip instead of paging each table
+CREATE OR REPLACE FUNCTION get_recent(
+    start_ts TIMESTAMP,
+    end_ts TIMESTAMP DEFAULT NULL
+)
+RETURNS JSON
+LANGUAGE sql STABLE
+AS $$
+    SELECT json_build_object(
+        'quality', COALESCE((
+            SELECT json_agg(wq ORDER BY wq.timestamp DESC)
+            FROM (
+                SELECT id, timestamp, parameter_name, value
+                FROM water_quality
+                WHERE timestamp >= start_ts
+                  AND (end_ts IS NULL OR timestamp <= end_ts)
+            ) wq
+        ), '[]'::json),
+        'flow', COALESCE((
+            SELECT json_agg(fr ORDER BY fr.timestamp DESC)
+            FROM (
+                SELECT id, timestamp, location_name, totalizer
+                FROM flow_rate
+                WHERE timestamp >= start_ts
+                  AND (end_ts IS NULL OR timestamp <= end_ts)
+            ) fr
+        ), '[]'::json)
+    );
+$$;
+
+-- Empties both tables for a fresh historical load in one call
+-- (rpc/truncate_ingestion). TRUNCATE drops the data files instead of
+-- deleting and logging every row. It bypasses RLS, so only the service
+-- role may call it: the anon key is public and must not be able to wipe
+-- the tables
+CREATE OR REPLACE FUNCTION truncate_ingestion()
+RETURNS void
+LANGUAGE sql SECURITY DEFINER
+SET search_path = public
+AS $$
+    TRUNCATE water_quality, flow_rate RESTART IDENTITY;
+$$;
+
+REVOKE EXECUTE ON FUNCTION truncate_ingestion() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION truncate_ingestion() TO service_role;
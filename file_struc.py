@@ -2,9 +2,6 @@ import os
 from pathlib import Path
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-
 # Base directory (current folder)
 base_dir = Path(__file__).parent
 
@@ -44,18 +41,25 @@ list_of_files = [
     ".env.example"
 ]
 
-# Create files and directories
-for filepath in list_of_files:
-    filepath = base_dir / filepath
-    filedir, filename = os.path.split(filepath)
+def create_structure():
+    """Create any missing folders and empty files from list_of_files"""
+    for filepath in list_of_files:
+        filepath = base_dir / filepath
+        filedir, filename = os.path.split(filepath)
+
+        if filedir:
+            os.makedirs(filedir, exist_ok=True)
+            logging.info(f"Created directory: {filedir}")
 
-    if filedir:
-        os.makedirs(filedir, exist_ok=True)
-        logging.info(f"Created directory: {filedir}")
+        if not filepath.exists():
+            with open(filepath, "w") as f:
+                pass  # create empty file
+            logging.info(f"Created file: {filepath}")
 
-    if not filepath.exists():
-        with open(filepath, "w") as f:
-            pass  # create empty file
-        logging.info(f"Created file: {filepath}")
+    logging.info("✅ Project structure created successfully!")
 
-logging.info("✅ Project structure created successfully!")
\ No newline at end of file
+# One-shot scaffolding: only touch the filesystem when run as a script, never on import
+if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    create_structure()
@@ -1,5 +1,6 @@
+import re
+import logging
 import pandas as pd
-from collections import defaultdict
 import io
 from datetime import datetime, timedelta
 import numpy as np
@@ -7,75 +8,111 @@ import numpy as np
 QUALITY_FILE = "data/water_quality_data.csv"
 FLOW_FILE = "data/water_flow_data.csv"
 
+log = logging.getLogger(__name__)
+
+# Parameter header row, e.g. "1. HUMIDITY, Safe Range: (30 to 70)": the name is
+# everything after the leading number up to "Safe Range:", then the two bounds
+PARAM_HEADER_RE = re.compile(
+    r"^\S*\s+(?P<name>.*?)\s*Safe Range:\s*\(?\s*(?P<safe_min>[-+.\deE]+)\s*to\s*(?P<safe_max>[-+.\deE]+)"
+)
+
+def parse_export_timestamps(dates, times, dayfirst=False):
+    """Parse the exports' DD-MM-YYYY date and HH:MM:SS time columns into timestamps.
+
+    Well-formed pairs are reordered into ISO 8601 for pandas' ISO fast path;
+    anything else falls back to the strict export layout and then to per-value
+    inference. Pairs that still don't parse come back as NaT.
+    """
+    dates, times = dates.astype(str), times.astype(str)
+    iso = dates.str.slice(6, 10) + "-" + dates.str.slice(3, 5) + "-" + dates.str.slice(0, 2) + "T" + times
+    timestamp = pd.to_datetime(
+        iso.where(dates.str.fullmatch(r"\d{2}-\d{2}-\d{4}")), format="ISO8601", errors="coerce"
+    )
+    for fallback_format in ("%d-%m-%Y %H:%M:%S", "mixed"):
+        retry = timestamp.isna()
+        if not retry.any():
+            break
+        # Joined strings are only built for the (usually few) rows that need them
+        combined = dates[retry].str.cat(times[retry], sep=" ")
+        timestamp[retry] = pd.to_datetime(
+            combined, format=fallback_format, dayfirst=dayfirst, errors="coerce"
+        )
+    return timestamp
+
 # -------- WATER QUALITY DRY RUN --------
 def process_water_quality_dryrun(file_path):
     try:
-        df = pd.read_csv(file_path, header=None)
-        print(f"📊 Water Quality CSV loaded: {len(df)} rows")
+        df = pd.read_csv(file_path, header=None, dtype=str, engine="pyarrow")
+        log.info(f"📊 Water Quality CSV loaded: {len(df)} rows")
         
-        rows_by_param = defaultdict(list)
-        current_param = None
-        safe_min, safe_max = None, None
+        first_col = df[0].astype(str)
 
-        for _, row in df.iterrows():
-            line = str(row[0])
+        # Parameter header rows ("1. HUMIDITY, Safe Range: (30 to 70)") set the
+        # parameter and safe range for the data rows below them until the next header
+        header_mask = first_col.str.contains("Safe Range", regex=False)
+        headers = first_col[header_mask].str.extract(PARAM_HEADER_RE)
+        param_names = headers["name"].str.replace("(HUMIDITY)", "HUMIDITY", regex=False).str.strip()
 
-            if "Safe Range" in line:
-                param_name = line.split("Safe Range:")[0].split(" ", 1)[1].strip()
-                param_name = param_name.replace("(HUMIDITY)", "HUMIDITY").strip()
-                safe_range_str = line.split("Safe Range:")[1].strip(" ()")
-                safe_min, safe_max = [float(x) for x in safe_range_str.split("to")]
-                current_param = param_name
-                continue
+        df["parameter_name"] = param_names.reindex(df.index).ffill()
+        df["safe_min"] = headers["safe_min"].astype(float).reindex(df.index).ffill()
+        df["safe_max"] = headers["safe_max"].astype(float).reindex(df.index).ffill()
 
-            if "Date" in line or "Time" in str(row[1]) or pd.isna(row[0]):
-                continue
+        # Column headings, blank rows and anything without a parseable date/time drop out
+        data_mask = (
+            ~header_mask
+            & ~first_col.str.contains("Date", regex=False)
+            & ~df[1].astype(str).str.contains("Time", regex=False)
+            & df[0].notna()
+        )
+        data = df[data_mask].copy()
+        data["timestamp"] = parse_export_timestamps(data[0], data[1], dayfirst=True)
+        data["value"] = pd.to_numeric(data[2], errors="coerce")
+        data = data[data["timestamp"].notna() & (data["value"].notna() | data[2].isna())]
 
-            try:
-                timestamp = pd.to_datetime(f"{row[0]} {row[1]}", dayfirst=True)
-                value = float(row[2])
-                rows_by_param[current_param].append({
-                    "timestamp": timestamp,
-                    "parameter_name": current_param,
-                    "value": value,
-                    "safe_min": safe_min,
-                    "safe_max": safe_max
-                })
-            except Exception as e:
-                continue
+        # One array per field per parameter; the safe range is stored once
+        rows_by_param = {
+            param: {
+                "ts": group["timestamp"].to_numpy(),
+                "value": group["value"].to_numpy(dtype=np.float64),
+                "safe_min": float(group["safe_min"].iloc[0]),
+                "safe_max": float(group["safe_max"].iloc[0])
+            }
+            for param, group in data.groupby("parameter_name", sort=False)
+        }
 
-        print("\n🧪 WATER QUALITY PARAMETERS ANALYSIS")
-        print("=" * 60)
+        log.info("\n🧪 WATER QUALITY PARAMETERS ANALYSIS")
+        log.info("=" * 60)
         
         for param, rows in rows_by_param.items():
-            if rows:
-                values = [r["value"] for r in rows]
-                cutoff = int(len(rows) * 0.8)
+            values = rows["value"]
+            if values.size:
+                cutoff = int(values.size * 0.8)
+                out_of_range = np.count_nonzero((values < rows["safe_min"]) | (values > rows["safe_max"]))
                 
-                print(f"\n📊 {param}")
-                print(f"   Safe Range: {rows[0]['safe_min']} to {rows[0]['safe_max']}")
-                print(f"   Total Records: {len(rows)}")
-                print(f"   Will Process: {cutoff} (80%)")
-                print(f"   Min Value: {min(values):.2f}")
-                print(f"   Max Value: {max(values):.2f}")
-                print(f"   Average: {np.mean(values):.2f}")
-                print(f"   Out of Range Count: {len([v for v in values if v < rows[0]['safe_min'] or v > rows[0]['safe_max']])}")
+                log.info(f"\n📊 {param}")
+                log.info(f"   Safe Range: {rows['safe_min']} to {rows['safe_max']}")
+                log.info(f"   Total Records: {values.size}")
+                log.info(f"   Will Process: {cutoff} (80%)")
+                log.info(f"   Min Value: {np.nanmin(values):.2f}")
+                log.info(f"   Max Value: {np.nanmax(values):.2f}")
+                log.info(f"   Average: {values.mean():.2f}")
+                log.info(f"   Out of Range Count: {out_of_range}")
                 
         return rows_by_param
             
     except Exception as e:
-        print(f"❌ Error processing water quality data: {e}")
+        log.error(f"❌ Error processing water quality data: {e}")
         return {}
 
 # -------- COMPLETELY REWRITTEN FLOW RATE PROCESSING --------
 def process_flow_rate_dryrun(file_path):
     try:
         # Read the CSV file without assuming headers
-        df = pd.read_csv(file_path, header=None)
-        print(f"\n🌊 Flow CSV loaded: {df.shape[0]} rows, {df.shape[1]} columns")
+        df = pd.read_csv(file_path, header=None, dtype=str, engine="pyarrow")
+        log.info(f"\n🌊 Flow CSV loaded: {df.shape[0]} rows, {df.shape[1]} columns")
         
-        print("First 10 rows of raw data:")
-        print(df.head(10))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(f"First 10 rows of raw data:\n{df.head(10)}")
         
         # Expected locations
         expected_locations = [
@@ -87,219 +124,226 @@ def process_flow_rate_dryrun(file_path):
         ]
         
         # Parse the data structure based on your Excel format
-        rows_by_location = defaultdict(list)
-        total_processed = 0
-        total_skipped = 0
-        current_location = None
+        col_a = df[0].where(df[0].notna(), "").astype(str).str.strip()
+        col_b = df[1].where(df[1].notna(), "").astype(str).str.strip()
+        col_c = df[2].where(df[2].notna(), "").astype(str).str.strip()
+        
+        log.info(f"\n🔍 PARSING CSV STRUCTURE...")
+        
+        # Location header rows start a section; forward-fill the name onto its rows
+        location_mask = col_a.str.startswith("Location Name:")
+        header_mask = (
+            ~location_mask
+            & col_a.str.lower().eq("date")
+            & col_b.str.lower().eq("time")
+            & col_c.str.lower().eq("totalizer")
+        )
+        empty_mask = col_a.eq("") & col_b.eq("") & col_c.eq("")
+        location = col_a.where(location_mask).str.replace("Location Name:", "", regex=False).str.strip()
+        current_location = location.ffill()
+        
+        # At debug level, echo the first 20 rows as parsed
+        if log.isEnabledFor(logging.DEBUG):
+            for index in df.index[:20]:
+                log.debug(f"Row {index}: A='{col_a[index]}' | B='{col_b[index]}' | C='{col_c[index]}'")
+        
+        # Section markers are echoed in file order
+        for index in df.index[location_mask | header_mask]:
+            if location_mask[index]:
+                log.info(f"📍 Found location section: {location[index]}")
+            elif header_mask[index]:
+                log.info(f"📋 Found header row for location: {current_location[index]}")
+        
+        candidate_mask = ~(location_mask | header_mask | empty_mask)
+        complete_mask = (
+            candidate_mask
+            & current_location.fillna("").ne("")
+            & col_a.ne("") & col_b.ne("") & col_c.ne("")
+        )
+        # Malformed "########" dates are neither processed nor counted as skipped
+        data_mask = complete_mask & col_a.ne("########")
         
-        print(f"\n🔍 PARSING CSV STRUCTURE...")
+        totalizer = pd.to_numeric(col_c[data_mask], errors="coerce")
+        timestamp = parse_export_timestamps(col_a[data_mask], col_b[data_mask])
         
-        for index, row in df.iterrows():
+        parsed_mask = totalizer.notna() & timestamp.notna()
+        total_processed = int(parsed_mask.sum())
+        total_skipped = int((candidate_mask & ~complete_mask).sum()) + int((~parsed_mask).sum())
+        
+        # Only parse errors among the first 50 rows are reported
+        for index in parsed_mask.index[~parsed_mask]:
+            if index >= 50:
+                break
             try:
-                # Convert row to string values for easier parsing
-                col_a = str(row[0]).strip() if pd.notna(row[0]) else ""
-                col_b = str(row[1]).strip() if pd.notna(row[1]) else ""
-                col_c = str(row[2]).strip() if pd.notna(row[2]) else ""
-                
-                # Debug print for first 20 rows
-                if index < 20:
-                    print(f"Row {index}: A='{col_a}' | B='{col_b}' | C='{col_c}'")
-                
-                # Check if this row contains a location header
-                if col_a.startswith("Location Name:"):
-                    current_location = col_a.replace("Location Name:", "").strip()
-                    print(f"📍 Found location section: {current_location}")
-                    continue
-                
-                # Check if this is a header row (Date, Time, Totalizer)
-                if col_a.lower() == "date" and col_b.lower() == "time" and col_c.lower() == "totalizer":
-                    print(f"📋 Found header row for location: {current_location}")
-                    continue
-                
-                # Skip empty rows
-                if not col_a and not col_b and not col_c:
-                    continue
-                
-                # Try to parse as data row if we have a current location
-                if current_location and col_a and col_b and col_c:
-                    try:
-                        # Parse date and time
-                        if col_a != "########":  # Skip malformed date entries
-                            # Try different date formats
-                            date_str = col_a
-                            time_str = col_b
-                            totalizer_val = float(col_c)
-                            
-                            # Create timestamp
-                            try:
-                                # Try DD-MM-YYYY format first
-                                if len(date_str) == 10 and date_str.count('-') == 2:
-                                    timestamp = pd.to_datetime(f"{date_str} {time_str}", format="%d-%m-%Y %H:%M:%S")
-                                else:
-                                    timestamp = pd.to_datetime(f"{date_str} {time_str}")
-                            except:
-                                # Fallback to automatic parsing
-                                timestamp = pd.to_datetime(f"{date_str} {time_str}")
-                            
-                            rows_by_location[current_location].append({
-                                "timestamp": timestamp,
-                                "location_name": current_location,
-                                "totalizer": totalizer_val
-                            })
-                            total_processed += 1
-                            
-                    except Exception as parse_error:
-                        total_skipped += 1
-                        if index < 50:  # Only show parse errors for first 50 rows
-                            print(f"   Parse error row {index}: {parse_error}")
-                        continue
-                else:
-                    total_skipped += 1
-                    continue
-                    
-            except Exception as row_error:
-                total_skipped += 1
-                continue
+                float(col_c[index])
+                pd.to_datetime(f"{col_a[index]} {col_b[index]}")
+            except Exception as parse_error:
+                log.warning(f"   Parse error row {index}: {parse_error}")
+        
+        parsed = pd.DataFrame({
+            "timestamp": timestamp[parsed_mask],
+            "location_name": current_location[data_mask][parsed_mask],
+            "totalizer": totalizer[parsed_mask]
+        })
+        # One array per field per location
+        rows_by_location = {
+            location_name: {
+                "ts": group["timestamp"].to_numpy(),
+                "totalizer": group["totalizer"].to_numpy(dtype=np.float64)
+            }
+            for location_name, group in parsed.groupby("location_name", sort=False)
+        }
 
-        print(f"\n📊 PROCESSING SUMMARY")
-        print(f"✅ Successfully processed: {total_processed} rows")
-        print(f"❌ Skipped: {total_skipped} rows")
+        log.info(f"\n📊 PROCESSING SUMMARY")
+        log.info(f"✅ Successfully processed: {total_processed} rows")
+        log.info(f"❌ Skipped: {total_skipped} rows")
         
-        print(f"\n🏭 LOCATION-WISE FLOW ANALYSIS")
-        print("=" * 80)
+        log.info(f"\n🏭 LOCATION-WISE FLOW ANALYSIS")
+        log.info("=" * 80)
+        
+        # Sorted once and reused by every report section below
+        sorted_locations = sorted(rows_by_location)
+        # Whether each location's totalizer moved at all, shared by both reports
+        is_active = {
+            location: bool(rows["totalizer"].size and np.ptp(rows["totalizer"]) > 0)
+            for location, rows in rows_by_location.items()
+        }
         
         # Detailed analysis for each location
-        for location_name, rows in sorted(rows_by_location.items()):
-            if rows:
-                totalizer_values = [r["totalizer"] for r in rows]
-                cutoff = int(len(rows) * 0.8)
+        for location_name in sorted_locations:
+            rows = rows_by_location[location_name]
+            timestamps = rows["ts"]
+            totalizer_values = rows["totalizer"]
+            if totalizer_values.size:
+                cutoff = int(totalizer_values.size * 0.8)
                 
-                # Calculate flow rates (difference between consecutive totalizer readings)
-                flow_rates = []
-                for i in range(1, len(rows)):
-                    time_diff = (rows[i]["timestamp"] - rows[i-1]["timestamp"]).total_seconds() / 3600  # hours
-                    totalizer_diff = rows[i]["totalizer"] - rows[i-1]["totalizer"]
-                    if time_diff > 0 and totalizer_diff >= 0:
-                        flow_rate = totalizer_diff / time_diff  # per hour
-                        flow_rates.append(flow_rate)
+                # Calculate flow rates (difference between consecutive totalizer readings),
+                # keeping only forward steps in time with a non-decreasing totalizer
+                time_diff = np.diff(timestamps) / np.timedelta64(1, "h")  # hours
+                totalizer_diff = np.diff(totalizer_values)
+                valid = (time_diff > 0) & (totalizer_diff >= 0)
+                flow_rates = totalizer_diff[valid] / time_diff[valid]  # per hour
                 
-                print(f"\n📍 {location_name}")
-                print(f"   📊 Total Records: {len(rows)}")
-                print(f"   🎯 Will Process: {cutoff} (80% of total)")
-                print(f"   🔢 Totalizer Range: {min(totalizer_values):.3f} - {max(totalizer_values):.3f}")
-                print(f"   📈 Average Totalizer: {np.mean(totalizer_values):.3f}")
+                log.info(f"\n📍 {location_name}")
+                log.info(f"   📊 Total Records: {totalizer_values.size}")
+                log.info(f"   🎯 Will Process: {cutoff} (80% of total)")
+                log.info(f"   🔢 Totalizer Range: {totalizer_values.min():.3f} - {totalizer_values.max():.3f}")
+                log.info(f"   📈 Average Totalizer: {totalizer_values.mean():.3f}")
                 
-                if flow_rates:
-                    print(f"   🌊 Flow Rate Analysis:")
-                    print(f"      Min Flow Rate: {min(flow_rates):.3f} units/hour")
-                    print(f"      Max Flow Rate: {max(flow_rates):.3f} units/hour") 
-                    print(f"      Avg Flow Rate: {np.mean(flow_rates):.3f} units/hour")
-                    print(f"      Flow Variations: {len([f for f in flow_rates if f > np.mean(flow_rates) * 1.5])} peak periods")
+                if flow_rates.size:
+                    mean_rate = flow_rates.mean()
+                    log.info(f"   🌊 Flow Rate Analysis:")
+                    log.info(f"      Min Flow Rate: {flow_rates.min():.3f} units/hour")
+                    log.info(f"      Max Flow Rate: {flow_rates.max():.3f} units/hour") 
+                    log.info(f"      Avg Flow Rate: {mean_rate:.3f} units/hour")
+                    log.info(f"      Flow Variations: {np.count_nonzero(flow_rates > mean_rate * 1.5)} peak periods")
                 
                 # Time pattern analysis
-                if len(rows) > 1:
-                    time_span = rows[-1]["timestamp"] - rows[0]["timestamp"]
-                    print(f"   ⏰ Time Span: {time_span.days} days, {time_span.seconds//3600} hours")
+                if timestamps.size > 1:
+                    first, last = pd.Timestamp(timestamps[0]), pd.Timestamp(timestamps[-1])
+                    time_span = last - first
+                    log.info(f"   ⏰ Time Span: {time_span.days} days, {time_span.seconds//3600} hours")
                     
                     # Sample timestamps to show data range
-                    print(f"   📅 First Record: {rows[0]['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}")
-                    print(f"   📅 Last Record: {rows[-1]['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}")
+                    log.info(f"   📅 First Record: {first.strftime('%Y-%m-%d %H:%M:%S')}")
+                    log.info(f"   📅 Last Record: {last.strftime('%Y-%m-%d %H:%M:%S')}")
                 
-                print(f"   ✅ Status: {'✓ Active' if max(totalizer_values) > min(totalizer_values) else '⚠ Inactive/No Flow'}")
+                log.info(f"   ✅ Status: {'✓ Active' if is_active[location_name] else '⚠ Inactive/No Flow'}")
         
         # Summary statistics
-        print(f"\n📋 OVERALL SUMMARY")
-        print("=" * 50)
-        print(f"🏭 Total Locations Found: {len(rows_by_location)}")
-        print(f"📍 Locations List:")
-        for i, location in enumerate(sorted(rows_by_location.keys()), 1):
-            record_count = len(rows_by_location[location])
-            totalizer_values = [r["totalizer"] for r in rows_by_location[location]]
-            status = "Active" if (totalizer_values and max(totalizer_values) > min(totalizer_values)) else "Inactive"
-            print(f"   {i}. {location} ({record_count} records) - {status}")
+        log.info(f"\n📋 OVERALL SUMMARY")
+        log.info("=" * 50)
+        log.info(f"🏭 Total Locations Found: {len(rows_by_location)}")
+        log.info(f"📍 Locations List:")
+        for i, location in enumerate(sorted_locations, 1):
+            record_count = rows_by_location[location]["totalizer"].size
+            status = "Active" if is_active[location] else "Inactive"
+            log.info(f"   {i}. {location} ({record_count} records) - {status}")
         
         # Check for expected locations
-        print(f"\n🔍 EXPECTED LOCATIONS CHECK:")
-        found_locations = set(rows_by_location.keys())
+        log.info(f"\n🔍 EXPECTED LOCATIONS CHECK:")
+        found_locations = set(sorted_locations)
+        lowered_locations = [(loc, loc.lower()) for loc in sorted_locations]
         
         for expected_loc in expected_locations:
             if expected_loc in found_locations:
-                print(f"   ✅ {expected_loc} - Found")
+                log.info(f"   ✅ {expected_loc} - Found")
             else:
-                print(f"   ❌ {expected_loc} - Missing")
+                log.info(f"   ❌ {expected_loc} - Missing")
                 # Check for partial matches
-                partial_matches = [loc for loc in found_locations 
-                                 if expected_loc.lower() in loc.lower() or loc.lower() in expected_loc.lower()]
+                expected_lower = expected_loc.lower()
+                partial_matches = [loc for loc, loc_lower in lowered_locations
+                                 if expected_lower in loc_lower or loc_lower in expected_lower]
                 if partial_matches:
-                    print(f"      🔍 Possible matches: {', '.join(partial_matches)}")
+                    log.info(f"      🔍 Possible matches: {', '.join(partial_matches)}")
         
         # Show all found locations for debugging
-        print(f"\n📍 ALL FOUND LOCATIONS ({len(found_locations)}):")
-        for i, loc in enumerate(sorted(found_locations), 1):
-            count = len(rows_by_location[loc])
-            print(f"   {i:2d}. '{loc}' ({count} records)")
+        log.info(f"\n📍 ALL FOUND LOCATIONS ({len(found_locations)}):")
+        for i, loc in enumerate(sorted_locations, 1):
+            count = rows_by_location[loc]["totalizer"].size
+            log.info(f"   {i:2d}. '{loc}' ({count} records)")
         
         return rows_by_location
         
     except Exception as e:
-        print(f"❌ Error processing flow rate data: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception(f"❌ Error processing flow rate data: {e}")
         return {}
 
 # -------- ENHANCED DATA PATTERN ANALYSIS --------
 def analyze_data_patterns(quality_data, flow_data):
     """Analyze patterns across both datasets"""
     
-    print(f"\n🔄 CROSS-DATASET PATTERN ANALYSIS")
-    print("=" * 60)
+    log.info(f"\n🔄 CROSS-DATASET PATTERN ANALYSIS")
+    log.info("=" * 60)
     
     if quality_data:
-        total_quality_records = sum(len(records) for records in quality_data.values())
-        print(f"📊 Total Quality Records: {total_quality_records}")
-        print(f"📋 Quality Parameters: {len(quality_data)}")
+        total_quality_records = sum(records["value"].size for records in quality_data.values())
+        log.info(f"📊 Total Quality Records: {total_quality_records}")
+        log.info(f"📋 Quality Parameters: {len(quality_data)}")
     
     if flow_data:
-        total_flow_records = sum(len(records) for records in flow_data.values()) 
-        print(f"🌊 Total Flow Records: {total_flow_records}")
-        print(f"📍 Flow Locations: {len(flow_data)}")
+        total_flow_records = sum(records["totalizer"].size for records in flow_data.values()) 
+        log.info(f"🌊 Total Flow Records: {total_flow_records}")
+        log.info(f"📍 Flow Locations: {len(flow_data)}")
         
         # Calculate data density (records per day)
         if total_flow_records > 0 and len(flow_data) > 0:
             # More realistic estimation based on actual data
             avg_records_per_location = total_flow_records / len(flow_data)
             estimated_days = avg_records_per_location / 96  # Assuming 15-min intervals
-            print(f"📅 Average Records per Location: {avg_records_per_location:.0f}")
-            print(f"📅 Estimated Days of Data: {estimated_days:.1f}")
-            print(f"⏱️  Expected 15-min Intervals: {estimated_days * 96:.0f} per location")
+            log.info(f"📅 Average Records per Location: {avg_records_per_location:.0f}")
+            log.info(f"📅 Estimated Days of Data: {estimated_days:.1f}")
+            log.info(f"⏱️  Expected 15-min Intervals: {estimated_days * 96:.0f} per location")
     
-    print(f"\n💡 RECOMMENDATIONS FOR REAL-TIME SIMULATION:")
-    print("- Use 1-5 second intervals for demo (speed up 900x-4500x)")
-    print("- Focus on locations with highest variation for interesting demos")
-    print("- Set quality alerts based on safe range violations")
-    print("- Highlight peak usage patterns in analytics")
+    log.info(f"\n💡 RECOMMENDATIONS FOR REAL-TIME SIMULATION:")
+    log.info("- Use 1-5 second intervals for demo (speed up 900x-4500x)")
+    log.info("- Focus on locations with highest variation for interesting demos")
+    log.info("- Set quality alerts based on safe range violations")
+    log.info("- Highlight peak usage patterns in analytics")
 
 # -------- MAIN EXECUTION --------
 if __name__ == "__main__":
-    print("🚀 WATER MANAGEMENT DATA ANALYSIS - STRUCTURE-AWARE VERSION")
-    print("=" * 80)
-    print("🎯 Analyzing 5-Location Flow Data + Quality Parameters")
-    print("🔧 FIXED: CSV structure parsing for Excel export format")
-    print("=" * 80)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
+    log.info("🚀 WATER MANAGEMENT DATA ANALYSIS - STRUCTURE-AWARE VERSION")
+    log.info("=" * 80)
+    log.info("🎯 Analyzing 5-Location Flow Data + Quality Parameters")
+    log.info("🔧 FIXED: CSV structure parsing for Excel export format")
+    log.info("=" * 80)
     
     # Process quality data
-    print("\n🧪 STEP 1: PROCESSING WATER QUALITY DATA")
+    log.info("\n🧪 STEP 1: PROCESSING WATER QUALITY DATA")
     quality_results = process_water_quality_dryrun(QUALITY_FILE)
     
     # Process flow data  
-    print("\n🌊 STEP 2: PROCESSING FLOW RATE DATA (5 LOCATIONS)")
+    log.info("\n🌊 STEP 2: PROCESSING FLOW RATE DATA (5 LOCATIONS)")
     flow_results = process_flow_rate_dryrun(FLOW_FILE)
     
     # Cross-analysis
-    print("\n🔍 STEP 3: PATTERN ANALYSIS")
+    log.info("\n🔍 STEP 3: PATTERN ANALYSIS")
     analyze_data_patterns(quality_results, flow_results)
     
-    print(f"\n🎉 ANALYSIS COMPLETE!")
-    print("=" * 50)
-    print("✅ Ready for real-time simulation integration")
-    print("🚀 Next step: Update React component with this data structure")
\ No newline at end of file
+    log.info(f"\n🎉 ANALYSIS COMPLETE!")
+    log.info("=" * 50)
+    log.info("✅ Ready for real-time simulation integration")
+    log.info("🚀 Next step: Update React component with this data structure")
\ No newline at end of file
@@ -1,6 +1,12 @@
+import csv
+import functools
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import json
 from datetime import datetime, timedelta
 import numpy as np
@@ -15,14 +21,77 @@ load_dotenv()
 # Configuration
 SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_ANON_KEY = os.getenv('SUPABASE_ANON_KEY')
+# Only needed to clear the tables before a reload; truncate_ingestion is
+# restricted to the service role
+SUPABASE_SERVICE_ROLE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
 QUALITY_FILE = "data/water_quality_data.csv"
 FLOW_FILE = "data/water_flow_data.csv"
 INGESTION_PERCENTAGE = 0.8
 
+# Insert batches posted to the REST API at the same time
+MAX_INSERT_WORKERS = 8
+EXPORT_TIMESTAMP_FORMAT = "%d-%m-%Y %H:%M:%S"
+ISO_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+# Leading list numbering ("1. ") and anything but word characters, spaces and
+# parentheses, stripped from parameter names
+NUMBER_PREFIX_RE = re.compile(r'^\d+\.\s*')
+NON_NAME_CHARS_RE = re.compile(r'[^\w\s()]')
+
+def parse_timestamps(date_times, dayfirst=False):
+    """Parse "date time" strings in one vectorized pass into a datetime Series.
+
+    Strings in the export's DD-MM-YYYY HH:MM:SS layout go through pandas' fixed
+    format parser; anything else falls back to per-value inference. Strings
+    that still don't parse come back as NaT.
+    """
+    date_times = pd.Series(date_times, dtype=object)
+    timestamps = pd.to_datetime(date_times, format=EXPORT_TIMESTAMP_FORMAT, errors="coerce", cache=True)
+    retry = timestamps.isna()
+    if retry.any():
+        timestamps[retry] = pd.to_datetime(date_times[retry], format="mixed", dayfirst=dayfirst, errors="coerce")
+    return timestamps
+
+def parse_values(values):
+    """Convert numeric strings to a float64 array in one pass; unparseable strings become NaN"""
+    return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+
 class SupabaseRestIngestion:
-    def __init__(self, supabase_url=SUPABASE_URL, anon_key=SUPABASE_ANON_KEY):
+    # Define allowed parameter names exactly as in database schema
+    ALLOWED_PARAMETERS = frozenset({
+        'HUMIDITY',
+        'ETP (TDS)',
+        'ETP (pH)',
+        'STP (TDS)',
+        'STP (TSS)',
+        'STP (BOD)',
+        'STP (pH)',
+        'STP (COD)'
+    })
+
+    # Specific normalization for common variations
+    NAME_MAPPING = {
+        'ETP TDS': 'ETP (TDS)',
+        'ETP pH': 'ETP (pH)',
+        'STP TDS': 'STP (TDS)',
+        'STP TSS': 'STP (TSS)',
+        'STP BOD': 'STP (BOD)',
+        'STP pH': 'STP (pH)',
+        'STP COD': 'STP (COD)',
+        'HUMIDITY': 'HUMIDITY',
+        'ETP(TDS)': 'ETP (TDS)',
+        'ETP(pH)': 'ETP (pH)',
+        'STP(TDS)': 'STP (TDS)',
+        'STP(TSS)': 'STP (TSS)',
+        'STP(BOD)': 'STP (BOD)',
+        'STP(pH)': 'STP (pH)',
+        'STP(COD)': 'STP (COD)'
+    }
+
+    def __init__(self, supabase_url=SUPABASE_URL, anon_key=SUPABASE_ANON_KEY, service_role_key=SUPABASE_SERVICE_ROLE_KEY):
         self.supabase_url = supabase_url
         self.anon_key = anon_key
+        self.service_role_key = service_role_key
         self.headers = {
             'apikey': self.anon_key,
             'Authorization': f'Bearer {self.anon_key}',
@@ -30,25 +99,31 @@ class SupabaseRestIngestion:
             'Prefer': 'return=minimal'
         }
         
-        # Define allowed parameter names exactly as in database schema
-        self.ALLOWED_PARAMETERS = {
-            'HUMIDITY',
-            'ETP (TDS)',
-            'ETP (pH)',
-            'STP (TDS)',
-            'STP (TSS)',
-            'STP (BOD)',
-            'STP (pH)',
-            'STP (COD)'
-        }
+        # One pooled session keeps connections (and their TLS handshakes) alive
+        # across every request. Retry only covers idempotent methods, so a
+        # failed insert POST is never sent twice
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=MAX_INSERT_WORKERS,
+            pool_maxsize=MAX_INSERT_WORKERS,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
-    def normalize_parameter_name(self, raw_name):
-        """Normalize parameter names to match database schema exactly"""
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def normalize_parameter_name(raw_name):
+        """Normalize parameter names to match database schema exactly
+
+        The export repeats the same few headers, so results are cached per raw name.
+        """
         # First clean the raw name
         cleaned = raw_name.strip()
         
         # Remove any numbering (like "1.") if present
-        cleaned = re.sub(r'^\d+\.\s*', '', cleaned)
+        cleaned = NUMBER_PREFIX_RE.sub('', cleaned)
         
         # Handle cases with trailing commas - remove them
         cleaned = cleaned.rstrip(',')
@@ -58,36 +133,17 @@ class SupabaseRestIngestion:
             cleaned = cleaned.split('Safe Range:')[0].strip()
         
         # Remove any remaining non-alphanumeric characters except parentheses and spaces
-        cleaned = re.sub(r'[^\w\s()]', '', cleaned).strip()
-        
-        # Specific normalization for common variations
-        name_mapping = {
-            'ETP TDS': 'ETP (TDS)',
-            'ETP pH': 'ETP (pH)',
-            'STP TDS': 'STP (TDS)',
-            'STP TSS': 'STP (TSS)',
-            'STP BOD': 'STP (BOD)',
-            'STP pH': 'STP (pH)',
-            'STP COD': 'STP (COD)',
-            'HUMIDITY': 'HUMIDITY',
-            'ETP(TDS)': 'ETP (TDS)',
-            'ETP(pH)': 'ETP (pH)',
-            'STP(TDS)': 'STP (TDS)',
-            'STP(TSS)': 'STP (TSS)',
-            'STP(BOD)': 'STP (BOD)',
-            'STP(pH)': 'STP (pH)',
-            'STP(COD)': 'STP (COD)'
-        }
+        cleaned = NON_NAME_CHARS_RE.sub('', cleaned).strip()
         
         # Check if the cleaned name matches any variations
-        normalized = name_mapping.get(cleaned, cleaned)
+        normalized = SupabaseRestIngestion.NAME_MAPPING.get(cleaned, cleaned)
         
         # Ensure proper spacing around parentheses
         normalized = normalized.replace('(', ' (').replace(')', ') ').strip()
         normalized = normalized.replace('  ', ' ')
         
         # Final validation against allowed parameters
-        if normalized in self.ALLOWED_PARAMETERS:
+        if normalized in SupabaseRestIngestion.ALLOWED_PARAMETERS:
             return normalized
         
         print(f"⚠️ Unrecognized parameter name: '{raw_name}' (normalized to '{normalized}')")
@@ -96,9 +152,8 @@ class SupabaseRestIngestion:
     def test_connection(self):
         """Test connection to Supabase REST API"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.supabase_url}/rest/v1/water_quality?select=count",
-                headers=self.headers,
                 timeout=10
             )
             if response.status_code == 200:
@@ -113,19 +168,20 @@ class SupabaseRestIngestion:
     def clear_existing_data(self):
         """Clear existing data via REST API"""
         try:
-            # Clear water_quality table
-            response = requests.delete(
-                f"{self.supabase_url}/rest/v1/water_quality?id=gte.0",
-                headers=self.headers
-            )
-            print(f"🧪 Water quality data cleared: {response.status_code}")
-            
-            # Clear flow_rate table
-            response = requests.delete(
-                f"{self.supabase_url}/rest/v1/flow_rate?id=gte.0",
-                headers=self.headers
+            if not self.service_role_key:
+                raise ValueError("SUPABASE_SERVICE_ROLE_KEY is required to clear existing data")
+            # Truncate water_quality and flow_rate in one call (see truncate_ingestion
+            # in database/init_db.sql) instead of deleting them row by row. The
+            # function is only executable by the service role
+            response = self.session.post(
+                f"{self.supabase_url}/rest/v1/rpc/truncate_ingestion",
+                headers={
+                    'apikey': self.service_role_key,
+                    'Authorization': f'Bearer {self.service_role_key}'
+                }
             )
-            print(f"🌊 Water flow data cleared: {response.status_code}")
+            print(f"🧪🌊 Water quality and flow data cleared: {response.status_code}")
+            response.raise_for_status()
             
             print("✅ Existing data cleared via REST API")
         except Exception as e:
@@ -133,87 +189,90 @@ class SupabaseRestIngestion:
             raise
     
     def process_water_quality_data(self, file_path):
-        """Process water quality data with strict parameter validation"""
+        """Process water quality data with strict parameter validation into one DataFrame per parameter"""
         try:
-            df = pd.read_csv(file_path, header=None)
-            print(f"📊 Water Quality CSV loaded: {len(df)} rows")
-            
-            rows_by_param = defaultdict(list)
+            columns = defaultdict(list)
             current_param = None
             safe_min, safe_max = None, None
             skipped_invalid_params = 0
             skipped_null_values = 0
+            row_count = 0
 
-            for _, row in df.iterrows():
-                line = str(row[0])
+            # The export is a line-oriented report rather than a table, so it is
+            # streamed row by row instead of being loaded into a DataFrame
+            with open(file_path, newline='') as f:
+                for row in csv.reader(f):
+                    if not row:
+                        continue
+                    row_count += 1
+                    line = row[0]
 
-                # Skip empty lines
-                if pd.isna(row[0]):
-                    continue
+                    # Skip empty lines
+                    if not line:
+                        continue
 
-                # Handle parameter definition lines (with "Safe Range")
-                if "Safe Range:" in line:
-                    try:
-                        # Extract the full parameter definition line
-                        param_line = line.split("Safe Range:")[0].strip()
-                        
-                        # Remove numbering if present (like "1. ")
-                        param_line = re.sub(r'^\d+\.\s*', '', param_line)
-                        
-                        # Normalize the parameter name
-                        current_param = self.normalize_parameter_name(param_line)
-                        if not current_param:
+                    # Handle parameter definition lines (with "Safe Range")
+                    if "Safe Range:" in line:
+                        try:
+                            # Extract the full parameter definition line
+                            param_line = line.split("Safe Range:")[0].strip()
+                            
+                            # Remove numbering if present (like "1. ")
+                            param_line = NUMBER_PREFIX_RE.sub('', param_line)
+                            
+                            # Normalize the parameter name
+                            current_param = self.normalize_parameter_name(param_line)
+                            if not current_param:
+                                skipped_invalid_params += 1
+                                continue
+                            
+                            # Extract safe range values
+                            safe_range_str = line.split("Safe Range:")[1].strip()
+                            safe_range_str = safe_range_str.strip(" ()")
+                            safe_min, safe_max = map(float, safe_range_str.split("to"))
+                            continue
+
+                        except Exception as e:
+                            print(f"⚠️ Error processing parameter definition: {line} - {str(e)}")
                             skipped_invalid_params += 1
                             continue
-                        
-                        # Extract safe range values
-                        safe_range_str = line.split("Safe Range:")[1].strip()
-                        safe_range_str = safe_range_str.strip(" ()")
-                        safe_min, safe_max = map(float, safe_range_str.split("to"))
-                        continue
 
-                    except Exception as e:
-                        print(f"⚠️ Error processing parameter definition: {line} - {str(e)}")
-                        skipped_invalid_params += 1
+                    # Skip header lines
+                    if any(x in line.lower() for x in ["date", "time", "parameter"]):
                         continue
 
-                # Skip header lines
-                if any(x in line.lower() for x in ["date", "time", "parameter"]):
-                    continue
-
-                # Process data rows
-                try:
+                    # Process data rows
                     if not current_param:
                         continue
                         
                     # Skip rows that don't have enough columns
-                    if pd.isna(row[0]) or pd.isna(row[1]) or pd.isna(row[2]):
+                    if len(row) < 3 or not row[1] or not row[2]:
                         skipped_null_values += 1
                         continue
                         
-                    # Parse timestamp
-                    timestamp = pd.to_datetime(f"{row[0]} {row[1]}", dayfirst=True)
-                    
-                    # Validate and clean value
-                    try:
-                        value = float(row[2])
-                        if not np.isfinite(value):
-                            skipped_null_values += 1
-                            continue
-                    except:
-                        skipped_null_values += 1
-                        continue
+                    # Rows are collected column-wise as raw strings, so the
+                    # whole file can be parsed and validated in one call
+                    columns["parameter_name"].append(current_param)
+                    columns["timestamp"].append(f"{row[0]} {row[1]}")
+                    columns["value"].append(row[2])
+                    columns["safe_min"].append(safe_min)
+                    columns["safe_max"].append(safe_max)
 
-                    rows_by_param[current_param].append({
-                        "timestamp": timestamp.isoformat(),
-                        "parameter_name": current_param,
-                        "value": value,
-                        "safe_min": safe_min,
-                        "safe_max": safe_max
-                    })
-                except Exception as e:
-                    skipped_null_values += 1
-                    continue
+            print(f"📊 Water Quality CSV loaded: {row_count} rows")
+
+            # Every parameter is sampled at the same times, so parsing them all
+            # in one call lets pandas' conversion cache cover the repeats
+            timestamps = parse_timestamps(columns["timestamp"], dayfirst=True)
+            records = pd.DataFrame({
+                "timestamp": timestamps.dt.strftime(ISO_TIMESTAMP_FORMAT),
+                "parameter_name": columns["parameter_name"],
+                "value": parse_values(columns["value"]),
+                "safe_min": columns["safe_min"],
+                "safe_max": columns["safe_max"]
+            })
+            valid = np.isfinite(records["value"]) & timestamps.notna()
+            skipped_null_values += int((~valid).sum())
+            rows_by_param = dict(list(records[valid].groupby("parameter_name", sort=False)))
 
             print(f"\n🧪 WATER QUALITY PROCESSING SUMMARY")
             print("=" * 60)
@@ -221,10 +280,10 @@ class SupabaseRestIngestion:
             print(f"⚠️ Skipped {skipped_null_values} rows with invalid/missing values")
             
             total_records = 0
-            for param, rows in rows_by_param.items():
-                if rows:
-                    cutoff = int(len(rows) * INGESTION_PERCENTAGE)
-                    historical_data = rows[:cutoff]
+            for param, records in rows_by_param.items():
+                if not records.empty:
+                    cutoff = int(len(records) * INGESTION_PERCENTAGE)
+                    historical_data = records.iloc[:cutoff]
                     print(f"📊 {param}: {len(historical_data)} records for ingestion")
                     rows_by_param[param] = historical_data
                     total_records += len(historical_data)
@@ -237,11 +296,8 @@ class SupabaseRestIngestion:
             return {}
     
     def process_flow_data(self, file_path):
-        """Process flow data without calculating flow_rate"""
+        """Process flow data without calculating flow_rate into one DataFrame per location"""
         try:
-            df = pd.read_csv(file_path, header=None)
-            print(f"🌊 Flow CSV loaded: {df.shape[0]} rows, {df.shape[1]} columns")
-            
             expected_locations = [
                 "Corporation Water",
                 "Ground Water Source 1", 
@@ -250,14 +306,20 @@ class SupabaseRestIngestion:
                 "Tanker Water Supply"
             ]
             
-            rows_by_location = defaultdict(list)
+            columns = defaultdict(list)
             current_location = None
+            row_count = 0
+            column_count = 0
             
-            for index, row in df.iterrows():
-                try:
-                    col_a = str(row[0]).strip() if pd.notna(row[0]) else ""
-                    col_b = str(row[1]).strip() if pd.notna(row[1]) else ""
-                    col_c = str(row[2]).strip() if pd.notna(row[2]) else ""
+            with open(file_path, newline='') as f:
+                for row in csv.reader(f):
+                    if not row:
+                        continue
+                    row_count += 1
+                    column_count = max(column_count, len(row))
+                    
+                    col_a, col_b, col_c = (row + ["", "", ""])[:3]
+                    col_a, col_b, col_c = col_a.strip(), col_b.strip(), col_c.strip()
                     
                     if col_a.startswith("Location Name:"):
                         current_location = col_a.replace("Location Name:", "").strip()
@@ -269,29 +331,31 @@ class SupabaseRestIngestion:
                     if not col_a and not col_b and not col_c:
                         continue
                     
-                    if current_location and col_a and col_b and col_c:
-                        try:
-                            if col_a != "########":
-                                date_str = col_a
-                                time_str = col_b
-                                totalizer_val = float(col_c)
-                                
-                                if len(date_str) == 10 and date_str.count('-') == 2:
-                                    timestamp = pd.to_datetime(f"{date_str} {time_str}", format="%d-%m-%Y %H:%M:%S")
-                                else:
-                                    timestamp = pd.to_datetime(f"{date_str} {time_str}")
-                                
-                                rows_by_location[current_location].append({
-                                    "timestamp": timestamp.isoformat(),
-                                    "location_name": current_location,
-                                    "totalizer": totalizer_val
-                                })
-                                
-                        except Exception as parse_error:
-                            continue
-                        
-                except Exception as row_error:
-                    continue
+                    # The raw timestamp and totalizer are parsed for the whole file after the loop
+                    if current_location and col_a and col_b and col_c and col_a != "########":
+                        columns["timestamp"].append(f"{col_a} {col_b}")
+                        columns["location_name"].append(current_location)
+                        columns["totalizer"].append(col_c)
+
+            print(f"🌊 Flow CSV loaded: {row_count} rows, {column_count} columns")
+
+            # Every location is read at the same times, so parsing them all in
+            # one call lets pandas' conversion cache cover the repeats
+            records = pd.DataFrame({
+                "timestamp": parse_timestamps(columns["timestamp"]),
+                "location_name": columns["location_name"],
+                "totalizer": parse_values(columns["totalizer"])
+            })
+            records = records[np.isfinite(records["totalizer"]) & records["timestamp"].notna()]
+            
+            rows_by_location = {}
+            for location_name, readings in records.groupby("location_name", sort=False):
+                # Readings are put in time order by a stable argsort of the
+                # int64 nanosecond timestamps, before they are formatted
+                readings = readings.iloc[np.argsort(readings["timestamp"].to_numpy().view("i8"), kind="stable")]
+                rows_by_location[location_name] = readings.assign(
+                    timestamp=readings["timestamp"].dt.strftime(ISO_TIMESTAMP_FORMAT)
+                )
 
             print(f"\n🌊 FLOW DATA PROCESSING SUMMARY")
             print("=" * 60)
@@ -299,12 +363,10 @@ class SupabaseRestIngestion:
             processed_locations = {}
             total_records = 0
             
-            for location_name, rows in rows_by_location.items():
-                if rows and location_name in expected_locations:
-                    rows.sort(key=lambda x: x['timestamp'])
-                    
-                    cutoff = int(len(rows) * INGESTION_PERCENTAGE)
-                    historical_data = rows[:cutoff]
+            for location_name, records in rows_by_location.items():
+                if not records.empty and location_name in expected_locations:
+                    cutoff = int(len(records) * INGESTION_PERCENTAGE)
+                    historical_data = records.iloc[:cutoff]
                     
                     print(f"📍 {location_name}: {len(historical_data)} records for ingestion")
                     processed_locations[location_name] = historical_data
@@ -317,73 +379,38 @@ class SupabaseRestIngestion:
             print(f"❌ Error processing flow rate data: {e}")
             return {}
     
-    def insert_data_batch(self, table_name, data, batch_size=1000):
-        """Insert data in batches via REST API"""
+    def insert_data_batch(self, table_name, data, batch_size=5000):
+        """Insert a DataFrame of records in batches via REST API, posting up to MAX_INSERT_WORKERS batches at once"""
         try:
-            total_inserted = 0
             total_batches = (len(data) + batch_size - 1) // batch_size
             
-            for i in range(0, len(data), batch_size):
-                batch = data[i:i + batch_size]
+            def post_batch(i):
+                batch = data.iloc[i:i + batch_size]
                 batch_num = (i // batch_size) + 1
                 
-                response = requests.post(
+                # Record dicts only exist for the batch being sent. orjson encodes
+                # them far faster than requests' stdlib json; the session headers
+                # already declare the application/json body
+                response = self.session.post(
                     f"{self.supabase_url}/rest/v1/{table_name}",
-                    headers=self.headers,
-                    json=batch,
+                    data=orjson.dumps(batch.to_dict(orient="records")),
                     timeout=30
                 )
                 
                 if response.status_code in [200, 201]:
                     print(f"   ✅ Batch {batch_num}/{total_batches}: {len(batch)} records inserted")
-                    total_inserted += len(batch)
-                else:
-                    print(f"   ❌ Batch {batch_num} failed: {response.status_code} - {response.text}")
+                    return len(batch)
+                print(f"   ❌ Batch {batch_num} failed: {response.status_code} - {response.text}")
+                return 0
             
-            return total_inserted
+            # Batches are independent rows, so the round trips can overlap
+            with ThreadPoolExecutor(max_workers=MAX_INSERT_WORKERS) as executor:
+                return sum(executor.map(post_batch, range(0, len(data), batch_size)))
             
         except Exception as e:
             print(f"❌ Error inserting batch: {e}")
             return 0
     
-    def insert_quality_data(self, quality_data):
-        """Insert water quality data via REST API"""
-        try:
-            total_inserted = 0
-            
-            for parameter, records in quality_data.items():
-                if not records:
-                    continue
-                    
-                print(f"📊 Inserting {parameter} ({len(records)} records)...")
-                inserted = self.insert_data_batch('water_quality', records)
-                total_inserted += inserted
-                
-            print(f"🎉 Total quality records inserted: {total_inserted}")
-            
-        except Exception as e:
-            print(f"❌ Error inserting quality data: {e}")
-            raise
-    
-    def insert_flow_data(self, flow_data):
-        """Insert water flow data via REST API"""
-        try:
-            total_inserted = 0
-            
-            for location, records in flow_data.items():
-                if not records:
-                    continue
-                    
-                print(f"🌊 Inserting {location} ({len(records)} records)...")
-                inserted = self.insert_data_batch('flow_rate', records)
-                total_inserted += inserted
-                
-            print(f"🎉 Total flow records inserted: {total_inserted}")
-            
-        except Exception as e:
-            print(f"❌ Error inserting flow data: {e}")
-            raise
-    
     def verify_data(self):
         """Verify inserted data via REST API"""
         try:
@@ -391,19 +418,13 @@ class SupabaseRestIngestion:
             print("=" * 50)
             
             # Check quality data count
-            response = requests.get(
-                f"{self.supabase_url}/rest/v1/water_quality?select=count",
-                headers=self.headers
-            )
+            response = self.session.get(f"{self.supabase_url}/rest/v1/water_quality?select=count")
             if response.status_code == 200:
                 quality_count = response.json()[0]['count']
                 print(f"🧪 Water Quality Records: {quality_count}")
             
             # Check flow data count
-            response = requests.get(
-                f"{self.supabase_url}/rest/v1/flow_rate?select=count",
-                headers=self.headers
-            )
+            response = self.session.get(f"{self.supabase_url}/rest/v1/flow_rate?select=count")
             if response.status_code == 200:
                 flow_count = response.json()[0]['count']
                 print(f"🌊 Water Flow Records: {flow_count}")
@@ -435,11 +456,11 @@ class SupabaseRestIngestion:
             
             if quality_data:
                 print("\n💾 STEP 2: INSERTING QUALITY DATA")
-                # Flatten data for batch insertion
-                all_quality_records = []
-                for param, records in quality_data.items():
-                    all_quality_records.extend(records)
-                self.insert_data_batch('water_quality', all_quality_records)
+                # Flatten data for batch insertion, so every parameter's batches
+                # share one concurrent upload
+                all_quality_records = pd.concat(quality_data.values(), ignore_index=True)
+                inserted = self.insert_data_batch('water_quality', all_quality_records)
+                print(f"🎉 Total quality records inserted: {inserted}")
             
             # Process and insert flow data
             print("\n🌊 STEP 3: PROCESSING FLOW DATA")
@@ -447,11 +468,11 @@ class SupabaseRestIngestion:
             
             if flow_data:
                 print("\n💾 STEP 4: INSERTING FLOW DATA")
-                # Flatten data for batch insertion
-                all_flow_records = []
-                for location, records in flow_data.items():
-                    all_flow_records.extend(records)
-                self.insert_data_batch('flow_rate', all_flow_records)
+                # Flatten data for batch insertion, so every location's batches
+                # share one concurrent upload
+                all_flow_records = pd.concat(flow_data.values(), ignore_index=True)
+                inserted = self.insert_data_batch('flow_rate', all_flow_records)
+                print(f"🎉 Total flow records inserted: {inserted}")
             
             # Verify
             print("\n🔍 STEP 5: VERIFICATION")
@@ -470,6 +491,12 @@ def main():
         print("SUPABASE_ANON_KEY=your-anon-key")
         return
     
+    if not SUPABASE_SERVICE_ROLE_KEY:
+        print("❌ Missing SUPABASE_SERVICE_ROLE_KEY (needed to clear existing data)")
+        print("📝 Add to your .env file:")
+        print("SUPABASE_SERVICE_ROLE_KEY=your-service-role-key")
+        return
+    
     if not os.path.exists(QUALITY_FILE):
         print(f"❌ Quality data file not found: {QUALITY_FILE}")
         return
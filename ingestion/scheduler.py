@@ -1,6 +1,9 @@
+import csv
+import functools
 import time
 from datetime import datetime
-from supabase import create_client
+import orjson
+import requests
 import os
 from dotenv import load_dotenv
 import pandas as pd
@@ -11,12 +14,49 @@ import random
 
 load_dotenv()
 
+QUALITY_FILE = "data/water_quality_data.csv"
+FLOW_FILE = "data/water_flow_data.csv"
+CYCLE_INTERVAL = 45  # seconds between cycle starts for the demo
+
+NUMBER_PREFIX_RE = re.compile(r'^\d+\.\s*')
+NON_NAME_CHARS_RE = re.compile(r'[^\w\s()]')
+NAME_MAPPING = {
+    'ETP TDS': 'ETP (TDS)', 'ETP pH': 'ETP (pH)',
+    'STP TDS': 'STP (TDS)', 'STP TSS': 'STP (TSS)',
+    'STP BOD': 'STP (BOD)', 'STP pH': 'STP (pH)',
+    'STP COD': 'STP (COD)', 'HUMIDITY': 'HUMIDITY',
+    'ETP(TDS)': 'ETP (TDS)', 'ETP(pH)': 'ETP (pH)',
+    'STP(TDS)': 'STP (TDS)', 'STP(TSS)': 'STP (TSS)',
+    'STP(BOD)': 'STP (BOD)', 'STP(pH)': 'STP (pH)',
+    'STP(COD)': 'STP (COD)'
+}
+
+def parse_timestamps(date_times):
+    """Parse the export's "DD-MM-YYYY HH:MM:SS" strings in one call, returning ISO strings (None where unparseable)"""
+    date_times = pd.Series(date_times, dtype=object)
+    timestamps = pd.to_datetime(date_times, format="%d-%m-%Y %H:%M:%S", errors="coerce", cache=True)
+    retry = timestamps.isna()
+    if retry.any():
+        timestamps[retry] = pd.to_datetime(date_times[retry], format="mixed", dayfirst=True, errors="coerce")
+    iso = timestamps.dt.strftime("%Y-%m-%dT%H:%M:%S")
+    return iso.where(timestamps.notna(), None).tolist()
+
+def parse_values(values):
+    """Convert numeric strings to a float64 array in one pass; unparseable strings become NaN"""
+    return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+
 class RemainingDataIngestor:
     def __init__(self):
-        self.supabase = create_client(
-            os.getenv("SUPABASE_URL"),
-            os.getenv("SUPABASE_ANON_KEY")
-        )
+        # Batches go straight to PostgREST as bulk upserts on one kept-alive session
+        self.rest_url = f"{os.getenv('SUPABASE_URL')}/rest/v1"
+        anon_key = os.getenv("SUPABASE_ANON_KEY")
+        self.session = requests.Session()
+        self.session.headers.update({
+            'apikey': anon_key,
+            'Authorization': f'Bearer {anon_key}',
+            'Content-Type': 'application/json',
+            'Prefer': 'resolution=merge-duplicates,return=minimal'
+        })
         self.parameters = [
             "HUMIDITY", "ETP (TDS)", "ETP (pH)",
             "STP (TDS)", "STP (TSS)", "STP (BOD)",
@@ -39,42 +79,48 @@ class RemainingDataIngestor:
             "STP (pH)": (6.5, 9.0),
             "STP (COD)": (1000, 3000)
         }
+        # Safe bounds as arrays indexed by parameter position, so a whole batch is
+        # checked in one comparison. Parameters without a range map to the
+        # trailing NaN bounds, which never compare as violations
+        self.param_index = {param: i for i, param in enumerate(self.parameters)}
+        self.safe_min = np.array([self.safe_ranges[p][0] for p in self.parameters] + [np.nan])
+        self.safe_max = np.array([self.safe_ranges[p][1] for p in self.parameters] + [np.nan])
+        # The remaining 20% never changes, so it is parsed into chunks once and
+        # each cycle takes the next chunk per table
+        self.quality_chunks = None
+        self.flow_chunks = None
+        self.cycle = 0
 
-    def normalize_parameter_name(self, raw_name):
-        """Identical to your main ingestion logic"""
-        cleaned = re.sub(r'^\d+\.\s*', '', raw_name.strip().rstrip(','))
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def normalize_parameter_name(raw_name):
+        """Identical to your main ingestion logic, cached per raw name"""
+        cleaned = NUMBER_PREFIX_RE.sub('', raw_name.strip().rstrip(','))
         if 'Safe Range:' in cleaned:
             cleaned = cleaned.split('Safe Range:')[0].strip()
-        cleaned = re.sub(r'[^\w\s()]', '', cleaned).strip()
-        
-        name_mapping = {
-            'ETP TDS': 'ETP (TDS)', 'ETP pH': 'ETP (pH)',
-            'STP TDS': 'STP (TDS)', 'STP TSS': 'STP (TSS)',
-            'STP BOD': 'STP (BOD)', 'STP pH': 'STP (pH)',
-            'STP COD': 'STP (COD)', 'HUMIDITY': 'HUMIDITY',
-            'ETP(TDS)': 'ETP (TDS)', 'ETP(pH)': 'ETP (pH)',
-            'STP(TDS)': 'STP (TDS)', 'STP(TSS)': 'STP (TSS)',
-            'STP(BOD)': 'STP (BOD)', 'STP(pH)': 'STP (pH)',
-            'STP(COD)': 'STP (COD)'
-        }
-        return name_mapping.get(cleaned, cleaned)
+        cleaned = NON_NAME_CHARS_RE.sub('', cleaned).strip()
+        return NAME_MAPPING.get(cleaned, cleaned)
+
+    def read_remaining_rows(self, file_path):
+        """Read the export's rows after the 80% mark as lists of three strings"""
+        with open(file_path, newline='') as f:
+            # Blank lines aren't rows, and short rows are padded out to three columns
+            rows = [(row + ["", "", ""])[:3] for row in csv.reader(f) if row]
+        return rows[int(len(rows) * 0.8):]  # Start after 80% mark
 
-    def get_remaining_data_chunks(self, file_path, chunk_size=10):
+    def get_remaining_data_chunks(self, file_path, chunk_size=5000):
         """Yield chunks of remaining 20% data per parameter/location"""
-        df = pd.read_csv(file_path, header=None)
-        total_rows = len(df)
-        start_idx = int(total_rows * 0.8)  # Start after 80% mark
+        rows = self.read_remaining_rows(file_path)
         
         # Process identical to main ingestion but for remaining data
-        rows_by_param_loc = defaultdict(list)
+        rows_by_param = defaultdict(list)
         current_param = None
         safe_min = safe_max = None
 
-        for idx in range(start_idx, total_rows):
-            row = df.iloc[idx]
-            line = str(row[0])
+        for row in rows:
+            line = row[0]
 
-            if pd.isna(row[0]):
+            if not line:
                 continue
 
             if "Safe Range:" in line:
@@ -89,47 +135,44 @@ class RemainingDataIngestor:
             if any(x in line.lower() for x in ["date", "time", "parameter"]):
                 continue
 
-            try:
-                if not current_param or pd.isna(row[0]) or pd.isna(row[1]) or pd.isna(row[2]):
-                    continue
-                
-                timestamp = pd.to_datetime(f"{row[0]} {row[1]}").isoformat()
-                value = float(row[2])
-                if not np.isfinite(value):
-                    continue
+            if not current_param or not row[1] or not row[2]:
+                continue
 
-                # Distribute across locations
+            rows_by_param[current_param].append((f"{row[0]} {row[1]}", row[2], safe_min, safe_max))
+
+        # Each parameter's timestamps and values are parsed in one call, then
+        # its valid rows are distributed across locations
+        rows_by_param_loc = defaultdict(list)
+        for param, param_rows in rows_by_param.items():
+            timestamps = parse_timestamps([date_time for date_time, *_ in param_rows])
+            values = parse_values([value for _, value, *_ in param_rows])
+            valid = np.isfinite(values) & np.not_equal(timestamps, None)
+            for (_, _, safe_min, safe_max), timestamp, value, ok in zip(param_rows, timestamps, values.tolist(), valid):
+                if not ok:
+                    continue
                 for location in self.locations:
-                    rows_by_param_loc[(current_param, location)].append({
+                    rows_by_param_loc[(param, location)].append({
                         "timestamp": timestamp,
-                        "parameter_name": current_param,
+                        "parameter_name": param,
                         "location_name": location, # Added location to the data for upsert
                         "value": value * (0.9 + 0.2 * random.random()),  # Add slight variation
                         "safe_min": safe_min,
                         "safe_max": safe_max
                     })
 
-            except Exception:
-                continue
-
         # Yield chunks per parameter-location combination
         for (param, loc), records in rows_by_param_loc.items():
             for i in range(0, len(records), chunk_size):
                 yield records[i:i + chunk_size]
 
-    def process_flow_chunks(self, file_path, chunk_size=10):
+    def process_flow_chunks(self, file_path, chunk_size=5000):
         """Yield chunks of remaining 20% flow data"""
-        df = pd.read_csv(file_path, header=None)
-        total_rows = len(df)
-        start_idx = int(total_rows * 0.8)
+        rows = self.read_remaining_rows(file_path)
         
         rows_by_loc = defaultdict(list)
         current_location = None
 
-        for idx in range(start_idx, total_rows):
-            row = df.iloc[idx]
-            col_a, col_b, col_c = str(row[0]), str(row[1]), str(row[2])
-
+        for col_a, col_b, col_c in rows:
             if col_a.startswith("Location Name:"):
                 current_location = col_a.replace("Location Name:", "").strip()
                 continue
@@ -137,18 +180,20 @@ class RemainingDataIngestor:
             if not all([col_a, col_b, col_c]) or col_a == "########":
                 continue
 
-            try:
-                timestamp = pd.to_datetime(f"{col_a} {col_b}").isoformat()
-                totalizer = float(col_c)
-                rows_by_loc[current_location].append({
-                    "timestamp": timestamp,
-                    "location_name": current_location,
-                    "totalizer": totalizer
-                })
-            except Exception:
-                continue
+            rows_by_loc[current_location].append({
+                "timestamp": f"{col_a} {col_b}",
+                "location_name": current_location,
+                "totalizer": col_c
+            })
 
         for loc, records in rows_by_loc.items():
+            timestamps = parse_timestamps([r["timestamp"] for r in records])
+            totalizers = parse_values([r["totalizer"] for r in records])
+            valid = np.isfinite(totalizers) & np.not_equal(timestamps, None)
+            records = [
+                dict(r, timestamp=ts, totalizer=totalizer)
+                for r, ts, totalizer, ok in zip(records, timestamps, totalizers.tolist(), valid) if ok
+            ]
             for i in range(0, len(records), chunk_size):
                 yield records[i:i + chunk_size]
 
@@ -156,7 +201,8 @@ class RemainingDataIngestor:
         """Insert or update batch with error handling"""
         try:
             # Upsert will update existing rows or insert new ones
-            response = self.supabase.table(table_name).upsert(batch).execute()
+            response = self.session.post(f"{self.rest_url}/{table_name}", data=orjson.dumps(batch), timeout=30)
+            response.raise_for_status()
             print(f"✅ Upserted {len(batch)} records to {table_name}")
             # Check alerts is still useful for logging
             self.check_alerts(batch) if table_name == "water_quality" else None
@@ -167,40 +213,60 @@ class RemainingDataIngestor:
 
     def check_alerts(self, batch):
         """Check for parameter violations"""
-        for record in batch:
+        unknown = len(self.parameters)
+        param_idx = np.fromiter(
+            (self.param_index.get(record['parameter_name'], unknown) for record in batch),
+            dtype=np.intp, count=len(batch)
+        )
+        values = np.fromiter((record['value'] for record in batch), dtype=np.float64, count=len(batch))
+        # Compared against the bounds directly: STP (BOD) has a lower bound of 0
+        violations = (values < self.safe_min[param_idx]) | (values > self.safe_max[param_idx])
+        
+        # Only the violating records are formatted
+        for i in np.flatnonzero(violations):
+            record = batch[i]
             param = record['parameter_name']
             value = record['value']
             # Note: Your CSV data is missing location_name for quality data.
             # I added it to the `get_remaining_data_chunks` function to make this log useful.
             location = record.get('location_name', 'N/A') 
-            min_val, max_val = self.safe_ranges.get(param, (None, None))
-            if min_val and (value < min_val or value > max_val):
-                print(f"🚨 ALERT: {param} = {value} (Safe: {min_val}-{max_val}) at {location}")
+            min_val, max_val = self.safe_ranges[param]
+            print(f"🚨 ALERT: {param} = {value} (Safe: {min_val}-{max_val}) at {location}")
+
+    def prepare_chunks(self):
+        """Parse the remaining 20% of both files into chunks, on the first call only"""
+        if self.quality_chunks is None:
+            self.quality_chunks = [chunk for chunk in self.get_remaining_data_chunks(QUALITY_FILE) if chunk]
+            self.flow_chunks = [chunk for chunk in self.process_flow_chunks(FLOW_FILE) if chunk]
 
     def run_ingestion_cycle(self):
         """Process remaining 20% in chunks every 45 seconds"""
         print("\n=== Starting 20% Data Ingestion ===")
+        self.prepare_chunks()
         
-        # Process quality data
-        quality_chunks = self.get_remaining_data_chunks("data/water_quality_data.csv")
-        for chunk in quality_chunks:
-            if chunk:
-                self.ingest_batch(chunk, "water_quality")
-        
-        # Process flow data
-        flow_chunks = self.process_flow_chunks("data/water_flow_data.csv")
-        for chunk in flow_chunks:
-            if chunk:
-                self.ingest_batch(chunk, "flow_rate")
+        for table_name, chunks in (("water_quality", self.quality_chunks), ("flow_rate", self.flow_chunks)):
+            if chunks:
+                # Wrap around to the first chunk so the demo keeps streaming
+                self.ingest_batch(chunks[self.cycle % len(chunks)], table_name)
+        self.cycle += 1
         
         print("=== Cycle Complete ===\n")
 
 def start_scheduler():
     """Start the scheduler for demo purposes"""
     ingestor = RemainingDataIngestor()
+    # Cycles start every CYCLE_INTERVAL seconds on the monotonic clock, so the
+    # time a cycle takes doesn't push every later cycle back
+    next_run = time.monotonic()
     while True:
         ingestor.run_ingestion_cycle()
-        time.sleep(45)  # 45-second interval for demo
+        next_run += CYCLE_INTERVAL
+        delay = next_run - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # An overrunning cycle restarts the cadence rather than bursting to catch up
+            next_run = time.monotonic()
 
 if __name__ == "__main__":
     start_scheduler()
\ No newline at end of file
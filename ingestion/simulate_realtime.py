@@ -1,19 +1,68 @@
+import csv
+import functools
+import io
 import time
-import random
-from datetime import datetime
-from supabase import create_client
+from contextlib import closing
+from datetime import datetime, timedelta
+import numpy as np
+import orjson
+import psycopg2
+import requests
 import os
 from dotenv import load_dotenv
-import threading
+from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv()
 
+REST_URL = f"{os.getenv('SUPABASE_URL')}/rest/v1"
+# Backoff between retries of a failed insert; after the last one the batch
+# goes back into the buffer for the next flush
+RETRY_DELAYS = (0.1, 0.4, 1.6)
+# Outcomes of insert_data. Only a transient failure keeps its batch for the
+# next flush: inserts are all-or-nothing, so a rejected batch would be sent
+# (and rejected) again on every flush after it
+INSERTED, RETRY_LATER, REJECTED = "inserted", "retry_later", "rejected"
+# Cap on rows per table carried over from failed flushes, so a long outage
+# can't grow the buffer without bound. The oldest rows go first
+MAX_RETAINED_ROWS = 10000
+NS_PER_SECOND = 1_000_000_000
+# Batches at least this large (a backfill after a stall, or rows carried over
+# an outage) skip PostgREST's JSON parsing and are loaded with COPY over a
+# direct Postgres connection, when SUPABASE_DB_URL is set
+COPY_THRESHOLD = 5000
+DB_URL = os.getenv("SUPABASE_DB_URL")
+COPY_COLUMNS = {
+    "water_quality": ("timestamp", "parameter_name", "value"),
+    "flow_rate": ("timestamp", "location_name", "totalizer")
+}
+
+def sleep_until(deadline):
+    """Sleep until a time.monotonic_ns() deadline, returning at once if it has passed"""
+    remaining = deadline - time.monotonic_ns()
+    if remaining > 0:
+        time.sleep(remaining / NS_PER_SECOND)
+
+@functools.lru_cache(maxsize=1)
+def get_session():
+    """Process-wide PostgREST session with the Supabase auth headers"""
+    # Inserts go straight to PostgREST on one kept-alive session, built on
+    # first use and shared by every simulator in the process, so each flush
+    # reuses the same connection pool instead of a fresh TLS handshake.
+    # return=minimal stops the server from echoing the inserted rows back
+    anon_key = os.getenv("SUPABASE_ANON_KEY")
+    session = requests.Session()
+    session.headers.update({
+        'apikey': anon_key,
+        'Authorization': f'Bearer {anon_key}',
+        'Content-Type': 'application/json',
+        'Prefer': 'return=minimal'
+    })
+    return session
+
 class RealtimeDataSimulator:
-    def __init__(self):
-        self.supabase = create_client(
-            os.getenv("SUPABASE_URL"),
-            os.getenv("SUPABASE_ANON_KEY")
-        )
+    def __init__(self, session=None):
+        self.rest_url = REST_URL
+        self.session = session or get_session()
         self.parameters = [
             "HUMIDITY", "ETP (TDS)", "ETP (pH)",
             "STP (TDS)", "STP (TSS)", "STP (BOD)",
@@ -36,80 +85,214 @@ class RealtimeDataSimulator:
             "STP (pH)": (6.5, 9.0),
             "STP (COD)": (1000, 3000)
         }
+        # Safe bounds per parameter and adjustments per location as arrays, so
+        # a tick's quality values come from one vectorized draw
+        self.range_low = np.array([self.safe_ranges[p][0] for p in self.parameters], dtype=float)
+        self.range_high = np.array([self.safe_ranges[p][1] for p in self.parameters], dtype=float)
+        self.location_multipliers = np.array([
+            0.9 if "Ground Water" in location  # Typically lower values
+            else 1.1 if "Industrial" in location  # Typically higher values
+            else 1.0
+            for location in self.locations
+        ])[:, None]
+        # Every draw comes from this instance's own generator, so simulators on
+        # different threads don't share (or contend on) the random module's state
+        self.rng = np.random.default_rng()
         self.running = False
+        # Readings are buffered so each table gets one bulk insert per flush
+        # instead of one per tick. A flush happens once FLUSH_MAX_ROWS quality
+        # rows are waiting or FLUSH_MAX_DELAY_S has passed since the last one,
+        # whichever comes first, bounding both memory and how stale the
+        # dashboard can get
+        self.quality_buffer = []
+        self.flow_buffer = []
+        self.flush_max_rows = int(os.getenv("FLUSH_MAX_ROWS", "5000"))
+        self.flush_max_delay = round(float(os.getenv("FLUSH_MAX_DELAY_S", "60")) * NS_PER_SECOND)
+        self.last_flush = time.monotonic_ns()
+        self.sync_safe_ranges()
 
-    def generate_realistic_value(self, param, location):
-        """Generate values with location-specific patterns"""
-        base_value = random.uniform(*self.safe_ranges[param])
+    def sync_safe_ranges(self):
+        """Upsert the safe ranges once, since readings no longer carry them"""
+        rows = [
+            {"parameter_name": param, "safe_min": safe_min, "safe_max": safe_max}
+            for param, (safe_min, safe_max) in self.safe_ranges.items()
+        ]
+        try:
+            response = self.session.post(
+                f"{self.rest_url}/parameter_safe_ranges",
+                data=orjson.dumps(rows),
+                headers={'Prefer': 'resolution=merge-duplicates,return=minimal'},
+                timeout=30
+            )
+            response.raise_for_status()
+        except Exception as e:
+            print(f"⚠️ Could not sync safe ranges: {e}")
+
+    def generate_realistic_values(self):
+        """Generate a (location, parameter) array of values with location-specific patterns"""
+        shape = (len(self.locations), len(self.parameters))
+        values = self.rng.uniform(self.range_low, self.range_high, size=shape) * self.location_multipliers
         
-        # Location-specific adjustments
-        if "Ground Water" in location:
-            base_value *= 0.9  # Typically lower values
-        elif "Industrial" in location:
-            base_value *= 1.1  # Typically higher values
-            
         # 5% chance of out-of-range for demo
-        if random.random() < 0.05:
-            return base_value * random.choice([0.8, 1.2])
-        return base_value
+        outliers = self.rng.random(shape) < 0.05
+        values = np.where(outliers, values * self.rng.choice([0.8, 1.2], size=shape), values)
+        return np.round(values, 2)
 
-    def simulate_readings(self):
+    def simulate_readings(self, taken_at=None):
         """Generate one set of readings across all parameters/locations"""
-        timestamp = datetime.now().isoformat()
+        timestamp = (taken_at or datetime.now()).isoformat()
         quality_data = []
         flow_data = []
         
-        for location in self.locations:
+        values = self.generate_realistic_values().tolist()
+        totalizers = np.round(self.rng.uniform(1000, 5000, size=len(self.locations)), 2).tolist()
+        
+        for location, location_values, totalizer in zip(self.locations, values, totalizers):
             # Quality data
-            for param in self.parameters:
+            # Safe ranges live in parameter_safe_ranges, not on every reading
+            for param, value in zip(self.parameters, location_values):
                 quality_data.append({
                     "timestamp": timestamp,
                     "parameter_name": param,
-                    "value": round(self.generate_realistic_value(param, location), 2),
-
-                    "safe_min": self.safe_ranges[param][0],
-                    "safe_max": self.safe_ranges[param][1]
+                    "value": value
                 })
             
             # Flow data
             flow_data.append({
                 "timestamp": timestamp,
                 "location_name": location,
-                "totalizer": round(random.uniform(1000, 5000), 2)
+                "totalizer": totalizer
             })
         
         return quality_data, flow_data
 
     def insert_data(self, data, table_name):
-        """Insert data with error handling"""
-        try:
-            response = self.supabase.table(table_name).insert(data).execute()
-            if response.data:
+        """Insert data, retrying dropped connections, timeouts and server errors with backoff
+
+        Returns INSERTED, RETRY_LATER (transient failure) or REJECTED
+        """
+        if DB_URL and len(data) >= COPY_THRESHOLD:
+            return self.copy_data(data, table_name)
+        payload = orjson.dumps(data)
+        for delay in (*RETRY_DELAYS, None):
+            try:
+                response = self.session.post(f"{self.rest_url}/{table_name}", data=payload, timeout=30)
+                response.raise_for_status()
                 print(f"✅ Real-time: Added {len(data)} records to {table_name}")
-                return True
+                return INSERTED
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                # A 4xx means the rows themselves were rejected; sending them again won't help
+                if isinstance(e, requests.HTTPError) and e.response.status_code < 500:
+                    print(f"❌ Real-time insert rejected, dropping {len(data)} records for {table_name}: {e}")
+                    return REJECTED
+                if delay is None:
+                    print(f"❌ Real-time insert failed, keeping {len(data)} records for {table_name}: {e}")
+                    return RETRY_LATER
+                time.sleep(delay)
+            except Exception as e:
+                print(f"❌ Real-time insert rejected, dropping {len(data)} records for {table_name}: {e}")
+                return REJECTED
+
+    def copy_data(self, data, table_name):
+        """Bulk-load a large batch with COPY instead of a PostgREST insert"""
+        columns = COPY_COLUMNS[table_name]
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([row[column] for column in columns] for row in data)
+        buffer.seek(0)
+        try:
+            # The inner `with conn` commits the load; closing() drops the connection after
+            with closing(psycopg2.connect(DB_URL)) as conn, conn, conn.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+            print(f"✅ Real-time: Copied {len(data)} records into {table_name}")
+            return INSERTED
+        except psycopg2.OperationalError as e:
+            # Connection-level failure; the load rolled back and can be retried
+            print(f"❌ Real-time COPY failed, keeping {len(data)} records for {table_name}: {e}")
+            return RETRY_LATER
         except Exception as e:
-            print(f"❌ Real-time insert failed: {e}")
-        return False
+            print(f"❌ Real-time COPY rejected, dropping {len(data)} records for {table_name}: {e}")
+            return REJECTED
+
+    def flush(self):
+        """Insert and clear whatever readings are buffered"""
+        batches = [
+            (rows, table_name, buffer_name)
+            for rows, table_name, buffer_name in (
+                (self.quality_buffer, "water_quality", "quality_buffer"),
+                (self.flow_buffer, "flow_rate", "flow_buffer")
+            )
+            if rows
+        ]
+        self.quality_buffer = []
+        self.flow_buffer = []
+        self.last_flush = time.monotonic_ns()
+        # The two tables' inserts are independent, so their round trips overlap
+        if batches:
+            with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+                results = [executor.submit(self.insert_data, rows, table_name) for rows, table_name, _ in batches]
+            for (rows, table_name, buffer_name), result in zip(batches, results):
+                if result.result() == RETRY_LATER:
+                    # Keep the batch so the next flush sends it along with the new readings
+                    setattr(self, buffer_name, rows[-MAX_RETAINED_ROWS:])
 
     def run_simulation(self, interval=30):
         """Run continuous simulation"""
         self.running = True
         print("🚀 Starting real-time simulation...")
         
+        # Ticks are anchored to the monotonic clock, so insert latency doesn't
+        # stretch the period and the readings stay evenly spaced. Deadlines are
+        # integer nanoseconds, so adding the interval never accumulates drift
+        interval_ns = round(interval * NS_PER_SECOND)
+        next_tick = time.monotonic_ns()
         while self.running:
-            quality_data, flow_data = self.simulate_readings()
-            
-            # Insert data
-            self.insert_data(quality_data, "water_quality")
-            self.insert_data(flow_data, "flow_rate")
+            next_tick = self.run_due_ticks(next_tick, interval_ns)
+            sleep_until(next_tick)
+        
+        # Stopped via self.running: don't drop the partial buffer
+        self.flush()
+
+    def run_due_ticks(self, next_tick, interval_ns):
+        """Buffer readings for every tick due by now and return the next deadline (monotonic ns)"""
+        # After a stall the missed ticks are backdated to when they were due
+        # and coalesce into the next flush instead of being dropped
+        now = time.monotonic_ns()
+        wall_now = datetime.now()
+        while self.running and next_tick <= now:
+            quality_data, flow_data = self.simulate_readings(wall_now - timedelta(microseconds=(now - next_tick) // 1000))
             
-            time.sleep(interval)
+            # Buffer data, inserting once a flush threshold is reached
+            self.quality_buffer.extend(quality_data)
+            self.flow_buffer.extend(flow_data)
+            next_tick += interval_ns
+            # Checked per tick so a long backfill goes out in capped batches
+            if (len(self.quality_buffer) >= self.flush_max_rows
+                    or time.monotonic_ns() - self.last_flush >= self.flush_max_delay):
+                self.flush()
+        return next_tick
 
-    def start(self):
-        """Start in background thread"""
-        thread = threading.Thread(target=self.run_simulation, daemon=True)
-        thread.start()
-        return thread
+    @classmethod
+    def run_many(cls, simulators, interval=30):
+        """Drive several simulators from one loop instead of a thread each"""
+        for simulator in simulators:
+            simulator.running = True
+        print(f"🚀 Starting real-time simulation for {len(simulators)} simulators...")
+        
+        interval_ns = round(interval * NS_PER_SECOND)
+        next_ticks = [time.monotonic_ns()] * len(simulators)
+        while True:
+            running = [i for i, simulator in enumerate(simulators) if simulator.running]
+            if not running:
+                break
+            for i in running:
+                next_ticks[i] = simulators[i].run_due_ticks(next_ticks[i], interval_ns)
+            sleep_until(min(next_ticks[i] for i in running))
+        
+        for simulator in simulators:
+            simulator.flush()
 
 def start_realtime():
     simulator = RealtimeDataSimulator()
@@ -117,6 +300,7 @@ def start_realtime():
         simulator.run_simulation(interval=20)  # Faster updates for demo
     except KeyboardInterrupt:
         simulator.running = False
+        simulator.flush()
         print("Simulation stopped")
 
 if __name__ == "__main__":
@@ -0,0 +1,36 @@
+import importlib
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+# The ingestion scripts are run from their own directory, not as a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "ingestion"))
+
+
+class FakeSession:
+    """Stands in for requests.Session; the alert check never sends anything"""
+    def __init__(self):
+        self.headers = {}
+
+
+@pytest.fixture
+def ingestor(monkeypatch):
+    """A RemainingDataIngestor built with the network modules stubbed out"""
+    fake_requests = types.ModuleType("requests")
+    fake_requests.Session = FakeSession
+    fake_dotenv = types.ModuleType("dotenv")
+    fake_dotenv.load_dotenv = lambda *args, **kwargs: None
+    monkeypatch.setitem(sys.modules, "requests", fake_requests)
+    monkeypatch.setitem(sys.modules, "dotenv", fake_dotenv)
+    monkeypatch.delitem(sys.modules, "scheduler", raising=False)
+    scheduler = importlib.import_module("scheduler")
+    return scheduler.RemainingDataIngestor()
+
+
+@pytest.mark.parametrize("value, alerts", [(6.0, True), (3.0, False), (-1.0, True)])
+def test_stp_bod_zero_lower_bound(ingestor, capsys, value, alerts):
+    """STP (BOD)'s safe range starts at 0, which must still be checked as a bound"""
+    ingestor.check_alerts([{"parameter_name": "STP (BOD)", "value": value}])
+    assert ("🚨 ALERT: STP (BOD)" in capsys.readouterr().out) == alerts